@@ -0,0 +1,79 @@
+"""
+Login storm benchmark.
+
+Fires concurrent logins at a running server while probing an unrelated
+endpoint, then reports login throughput, how many logins were shed with 503
+and the latency of the probe requests.
+
+    python benchmarks/login_load.py --url http://localhost:8000 \
+        --username admin --password secret --concurrency 64 --duration 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from httpx import AsyncClient
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+async def login_loop(
+    client: AsyncClient, credentials: dict, deadline: float, results: dict
+) -> None:
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        response = await client.post("/api/auth/login", data=credentials)
+        results["latencies"].append(time.monotonic() - started)
+        results["statuses"][response.status_code] = (
+            results["statuses"].get(response.status_code, 0) + 1
+        )
+
+
+async def probe_loop(
+    client: AsyncClient, path: str, deadline: float, latencies: list[float]
+) -> None:
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        await client.get(path)
+        latencies.append(time.monotonic() - started)
+        await asyncio.sleep(0.05)
+
+
+async def run(args: argparse.Namespace) -> None:
+    credentials = {"username": args.username, "password": args.password}
+    logins = {"latencies": [], "statuses": {}}
+    probes = []
+    async with AsyncClient(base_url=args.url, timeout=60) as client:
+        deadline = time.monotonic() + args.duration
+        await asyncio.gather(
+            *[
+                login_loop(client, credentials, deadline, logins)
+                for _ in range(args.concurrency)
+            ],
+            probe_loop(client, args.probe, deadline, probes),
+        )
+
+    succeeded = logins["statuses"].get(200, 0)
+    print(f"logins: {sum(logins['statuses'].values())} {logins['statuses']}")
+    print(f"login throughput: {succeeded / args.duration:.1f}/s")
+    print(f"login p99: {percentile(logins['latencies'], 0.99) * 1000:.0f} ms")
+    print(f"{args.probe} requests: {len(probes)}")
+    if probes:
+        print(f"{args.probe} median: {statistics.median(probes) * 1000:.1f} ms")
+    print(f"{args.probe} p99: {percentile(probes, 0.99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--probe", default="/api/health")
+    asyncio.run(run(parser.parse_args()))
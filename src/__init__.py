@@ -1,21 +1,37 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from src.config import settings
 from src.db import session_manager
 from src.redis import RedisClient
+from src.security import password_hasher
+from src.static import ImageFiles
+from src.denylist import listen as listen_denylist
 
 
 def init_app(init_db=True):
     lifespan = None
 
     if init_db:
-        session_manager.init(settings.DB_URL)
+        session_manager.init(settings.DB_URL, settings.DB_REPLICA_URLS)
         RedisClient(settings.REDIS_HOST, settings.REDIS_PASSWORD)
 
         @asynccontextmanager
         async def lifespan(app: FastAPI):
+            background = [asyncio.create_task(listen_denylist())]
+            if session_manager.has_replicas:
+                background.append(
+                    asyncio.create_task(
+                        session_manager.monitor_replicas(
+                            settings.DB_REPLICA_HEALTH_INTERVAL
+                        )
+                    )
+                )
             yield
+            for task in background:
+                task.cancel()
+            password_hasher.shutdown()
+            await RedisClient().close()
             if session_manager._engine is not None:
                 await session_manager.close()
 
@@ -24,7 +40,14 @@ def init_app(init_db=True):
     from .routers.auth import auth_router
     from .routers.user import users_router
     from .routers.role import roles_router
+    from .routers.job import jobs_router
+    from .routers.upload import uploads_router
+    from .routers.health import health_router
+    from .routers.metrics import metrics_router
     from .handlers import auth_jwt_exception_handler
+    from .uploads import RequestSizeLimit
+    from .pagination import NEXT_CURSOR_HEADER
+    from .resumable import LENGTH_HEADER, OFFSET_HEADER
     from fastapi_jwt_auth.exceptions import AuthJWTException
     from fastapi.middleware.cors import CORSMiddleware
 
@@ -35,14 +58,20 @@ def init_app(init_db=True):
     server.include_router(auth_router, prefix="/api")
     server.include_router(users_router, prefix="/api")
     server.include_router(roles_router, prefix="/api")
+    server.include_router(jobs_router, prefix="/api")
+    server.include_router(uploads_router, prefix="/api")
+    server.include_router(health_router, prefix="/api")
+    server.include_router(metrics_router, prefix="/api")
     server.add_exception_handler(AuthJWTException, auth_jwt_exception_handler)
+    server.add_middleware(RequestSizeLimit, paths={"/api/users/upload_image"})
     server.add_middleware(
         CORSMiddleware,
         allow_origins=origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, OFFSET_HEADER, LENGTH_HEADER],
     )
-    server.mount("/static", StaticFiles(directory=settings.STATIC_PATH), name="static")
+    server.mount("/static", ImageFiles(directory=settings.STATIC_PATH), name="static")
 
     return server
@@ -0,0 +1,90 @@
+import os
+import shutil
+from .models import Job
+
+
+def restored_name(filename: str) -> str:
+    # run.py swaps the last four characters for ".png": "a.jpeg" -> "a..png"
+    return f"{filename[:-4]}.png"
+
+
+def stage(
+    inputs: dict[Job, dict[str, str]], input_dir: str
+) -> tuple[dict[str, list[Job]], dict[str, str]]:
+    """
+    Gathers the inputs of several jobs, given as content hash to filename
+    in the job's folder, into one batch folder. Returns which jobs every
+    content hash belongs to and the staged filename of each. Identical
+    images from different jobs are restored once.
+    """
+    os.makedirs(input_dir, exist_ok=True)
+    routes, staged = {}, {}
+    for job, job_inputs in inputs.items():
+        for content_hash, filename in job_inputs.items():
+            if content_hash not in staged:
+                source = os.path.join(job.input_dir, filename)
+                target = os.path.join(input_dir, filename)
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy(source, target)
+                staged[content_hash] = filename
+            routes.setdefault(content_hash, []).append(job)
+    return routes, staged
+
+
+def route(
+    routes: dict[str, list[Job]], staged: dict[str, str], output_dir: str
+) -> set[Job]:
+    """
+    Copies restored files of a batch to the output folders of their jobs
+    as `<content hash>.png`. Returns jobs with at least one missing result.
+    """
+    incomplete = set()
+    for content_hash, jobs in routes.items():
+        filename = restored_name(staged[content_hash])
+        source = os.path.join(output_dir, "final_output", filename)
+        if not os.path.exists(source):
+            incomplete.update(jobs)
+            continue
+        for job in jobs:
+            target = os.path.join(job.output_dir, f"{content_hash}.png")
+            if not os.path.exists(target):
+                os.makedirs(job.output_dir, exist_ok=True)
+                shutil.copyfile(source, f"{target}.partial")
+                os.replace(f"{target}.partial", target)
+    return incomplete
+
+
+def shard(input_dir: str, count: int) -> list[str]:
+    """
+    Splits a staged batch folder into at most `count` folders of similar size.
+    """
+    filenames = sorted(os.listdir(input_dir))
+    count = max(1, min(count, len(filenames)))
+    shards = [f"{input_dir}_{i}" for i in range(count)]
+    for shard_dir in shards:
+        os.makedirs(shard_dir)
+    for i, filename in enumerate(filenames):
+        os.rename(
+            os.path.join(input_dir, filename),
+            os.path.join(shards[i % count], filename),
+        )
+    return shards
+
+
+def merge(outputs: list[str], output_dir: str) -> None:
+    """
+    Collects restored files of every shard into one `final_output` folder.
+    """
+    final_output = os.path.join(output_dir, "final_output")
+    os.makedirs(final_output, exist_ok=True)
+    for shard_output in outputs:
+        shard_final = os.path.join(shard_output, "final_output")
+        if not os.path.isdir(shard_final):
+            continue
+        for filename in os.listdir(shard_final):
+            os.replace(
+                os.path.join(shard_final, filename),
+                os.path.join(final_output, filename),
+            )
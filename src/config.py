@@ -1,4 +1,4 @@
-from pydantic import BaseSettings
+from pydantic import BaseSettings, validator
 
 
 class Settings(BaseSettings):
@@ -8,6 +8,17 @@ class Settings(BaseSettings):
     DB_NAME: str
     DB_PORT: int
     DB_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT: int = 30_000
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_HEALTH_INTERVAL: float = 5
+    DB_REPLICA_HEALTH_TIMEOUT: float = 2
+    DB_READ_YOUR_WRITES_WINDOW: int = 5
     AUTHJWT_SECRET_KEY: str
     AUTHJWT_DENYLIST_ENABLED: bool
     AUTHJWT_DENYLIST_TOKEN_CHECKS: set = {"access", "refresh"}
@@ -15,7 +26,71 @@ class Settings(BaseSettings):
     AUTHJWT_REFRESH_TOKEN_EXPIRES: int
     REDIS_HOST: str
     REDIS_PASSWORD: str
+    REDIS_MAX_CONNECTIONS: int = 64
+    REDIS_POOL_TIMEOUT: float = 2.0
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_RETRIES: int = 3
+    DENYLIST_CACHE_SIZE: int = 100_000
+    DENYLIST_CACHE_TTL: float = 5.0
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_LOCAL_TTL: float = 5.0
+    PRINCIPAL_CACHE_TTL: int = 60
     STATIC_PATH: str
+    STATIC_MAX_AGE: int = 365 * 24 * 60 * 60
+    STATIC_ACCEL_REDIRECT_PREFIX: str | None = None
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: str | None = None
+    S3_ENDPOINT_URL: str | None = None
+    S3_REGION: str | None = None
+    S3_ACCESS_KEY_ID: str | None = None
+    S3_SECRET_ACCESS_KEY: str | None = None
+    S3_URL_EXPIRY: int = 3600
+    S3_PART_SIZE: int = 8 * 1024 * 1024
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    INPUT_PATH: str = "/tmp/input_images"
+    WORKER_CONCURRENCY: int | None = None
+    WORKER_POLL_INTERVAL: float = 1.0
+    RESTORATION_WORKDIR: str = "/image-restoration/neural_link"
+    RESTORATION_WARMUP_MODULES: list[str] = ["torch"]
+    RESTORATION_STARTUP_TIMEOUT: float = 300
+    RESTORATION_HEALTH_TTL: int = 30
+    RESTORATION_THREADS: int = 1
+    RESTORATION_MODEL_VERSION: str = "1"
+    RESULT_CACHE_MAX_BYTES: int = 10 * 1024 * 1024 * 1024
+    RESULT_CACHE_EVICT_GRACE: int = 5 * 60
+    RESULT_CACHE_EVICT_INTERVAL: float = 60
+    BATCH_MAX_SIZE: int = 16
+    JOB_LEASE_TIMEOUT: int = 10 * 60
+    BATCH_MAX_WAIT: float = 0.2
+    BATCH_ROOT: str = "/tmp/batches"
+    BATCH_SHARD_MIN_SIZE: int = 4
+    PREPROCESS_MAX_SIDE: int = 4096
+    TILE_SIZE: int = 1024
+    TILE_OVERLAP: int = 64
+    DERIVATIVE_SIZES: dict[str, int] = {"thumbnail": 256, "small": 640, "large": 1600}
+    DERIVATIVE_FORMAT: str = "webp"
+    DERIVATIVE_QUALITY: int = 80
+    DERIVATIVE_WORKERS: int = 2
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    UPLOAD_MAX_FILE_SIZE: int = 50 * 1024 * 1024
+    UPLOAD_MAX_REQUEST_SIZE: int = 500 * 1024 * 1024
+    UPLOAD_MULTIPART_OVERHEAD: int = 64 * 1024
+    UPLOAD_SESSION_TTL: int = 60 * 60
+    UPLOAD_SESSION_MAX_FILES: int = 100
+    UPLOAD_SWEEP_INTERVAL: float = 5 * 60
+    UPLOAD_RESUMABLE_TTL: int = 24 * 60 * 60
+    UPLOAD_RESUMABLE_MAX_FILE_SIZE: int = 1024 * 1024 * 1024
+    UPLOAD_RESUMABLE_MAX_CHUNK_SIZE: int = 64 * 1024 * 1024
+    UPLOAD_RESUMABLE_LOCK_TIMEOUT: int = 5 * 60
+
+    @validator("TILE_OVERLAP")
+    def overlap_fits_tile(cls, value, values):
+        # Tiles advance by TILE_SIZE - TILE_OVERLAP pixels
+        if "TILE_SIZE" in values and not 0 <= value < values["TILE_SIZE"]:
+            raise ValueError("TILE_OVERLAP must be between 0 and TILE_SIZE")
+        return value
 
     class Config:
         env_file = "./.env"
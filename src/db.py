@@ -1,6 +1,14 @@
+import asyncio
 import contextlib
+import itertools
+import logging
+import time
 from typing import AsyncIterator
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -8,18 +16,122 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
+from .config import settings
+from .redis import RedisClient
 
 Base = declarative_base()
+logger = logging.getLogger(__name__)
+RECENT_WRITE_KEY_PREFIX = "db:recent_write:"
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts wait for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        return connection
+
+    def recreate(self):
+        # Keeps the counters when the engine replaces a pool after dispose
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.wait_total, pool.wait_max = self.wait_total, self.wait_max
+        return pool
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(0, self.overflow()),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_total, 6),
+            "wait_seconds_max": round(self.wait_max, 6),
+        }
 
 
 class DatabaseSessionManager:
     def __init__(self):
         self._engine: AsyncEngine | None = None
         self._session_maker: async_sessionmaker | None = None
+        self._replicas: list[AsyncEngine] = []
+        self._replica_session_makers: list[async_sessionmaker] = []
+        self._healthy_replicas: list[int] = []
+        self._next_replica = itertools.count()
 
-    def init(self, host: str):
-        self._engine = create_async_engine(host)
+    def init(self, host: str, replicas: list[str] | None = None):
+        self._engine = self._create_engine(host)
         self._session_maker = async_sessionmaker(bind=self._engine, autocommit=False)
+        self._replicas = [self._create_engine(replica) for replica in replicas or []]
+        self._replica_session_makers = [
+            async_sessionmaker(bind=replica, autocommit=False)
+            for replica in self._replicas
+        ]
+        # Replicas serve reads only once a health check has passed
+        self._healthy_replicas = []
+
+    @staticmethod
+    def _create_engine(host: str) -> AsyncEngine:
+        return create_async_engine(
+            host,
+            poolclass=TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            connect_args={
+                "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "server_settings": {
+                    "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)
+                },
+            },
+        )
+
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self._replicas)
+
+    async def check_replicas(self) -> None:
+        healthy = []
+        for i, replica in enumerate(self._replicas):
+            try:
+                await asyncio.wait_for(
+                    self._ping(replica), settings.DB_REPLICA_HEALTH_TIMEOUT
+                )
+            except Exception:
+                logger.warning("Read replica %s is unavailable", i)
+                continue
+            healthy.append(i)
+        self._healthy_replicas = healthy
+
+    @staticmethod
+    async def _ping(engine: AsyncEngine) -> None:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def monitor_replicas(self, interval: float) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(interval)
 
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
@@ -33,19 +145,51 @@ class DatabaseSessionManager:
                 await connection.rollback()
                 raise
 
+    def pool_stats(self) -> dict[str, int | float]:
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+        return self._engine.pool.stats()
+
     async def close(self):
         if self._engine is None:
             raise Exception("DatabaseSessionManager is not initialized")
         await self._engine.dispose()
+        for replica in self._replicas:
+            await replica.dispose()
         self._engine = None
         self._session_maker = None
+        self._replicas = []
+        self._replica_session_makers = []
+        self._healthy_replicas = []
 
     @contextlib.asynccontextmanager
-    async def session(self) -> AsyncIterator[AsyncSession]:
+    async def session(self, **options) -> AsyncIterator[AsyncSession]:
         if self._session_maker is None:
             raise Exception("DatabaseSessionManager is not initialized")
 
-        session = self._session_maker()
+        session = self._session_maker(**options)
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    @contextlib.asynccontextmanager
+    async def read_session(self, **options) -> AsyncIterator[AsyncSession]:
+        """
+        Session on a healthy replica, taken in turns,
+        or on the primary when none is available.
+        """
+        healthy = self._healthy_replicas
+        if not healthy:
+            async with self.session(**options) as session:
+                yield session
+            return
+
+        replica = healthy[next(self._next_replica) % len(healthy)]
+        session = self._replica_session_makers[replica](**options)
         try:
             yield session
         except Exception:
@@ -68,3 +212,35 @@ session_manager = DatabaseSessionManager()
 async def get_db():
     async with session_manager.session() as session:
         yield session
+
+
+async def mark_write(user_id: str) -> None:
+    """
+    Sends the user's reads to the primary for DB_READ_YOUR_WRITES_WINDOW
+    seconds, until replicas have caught up with their write.
+    """
+    if session_manager.has_replicas:
+        await RedisClient().async_conn.setex(
+            f"{RECENT_WRITE_KEY_PREFIX}{user_id}",
+            settings.DB_READ_YOUR_WRITES_WINDOW,
+            "1",
+        )
+
+
+async def get_read_db(request: Request):
+    """
+    Session for read-only endpoints. The user is known when the endpoint's
+    Auth dependency has run first and set `request.state.user_id`.
+    """
+    user_id = getattr(request.state, "user_id", None)
+    if user_id and session_manager.has_replicas:
+        recent_write = await RedisClient().async_conn.exists(
+            f"{RECENT_WRITE_KEY_PREFIX}{user_id}"
+        )
+        if recent_write:
+            async with session_manager.session() as session:
+                yield session
+            return
+
+    async with session_manager.read_session() as session:
+        yield session
@@ -0,0 +1,60 @@
+"""
+Revoked token ids live in Redis until the token would have expired anyway.
+Lookups are answered from a local cache: revoked ids are kept until expiry,
+ids found not revoked for DENYLIST_CACHE_TTL seconds, which bounds how long
+another instance may keep accepting a token revoked elsewhere. Revocations
+are also broadcast over pub/sub, so they usually apply everywhere at once.
+"""
+import asyncio
+import logging
+from redis.exceptions import ConnectionError, TimeoutError
+from .cache import LocalTTLCache
+from .config import settings
+from .redis import RedisClient
+
+
+DENYLIST_CHANNEL = "denylist:revoked"
+
+logger = logging.getLogger(__name__)
+local_cache = LocalTTLCache(settings.DENYLIST_CACHE_SIZE, settings.DENYLIST_CACHE_TTL)
+
+
+async def revoke(jti: str, expires: int) -> None:
+    conn = RedisClient().async_conn
+    await conn.setex(jti, expires, "true")
+    local_cache.set(jti, True, expires)
+    await conn.publish(DENYLIST_CHANNEL, f"{jti} {expires}")
+
+
+async def is_revoked(jti: str) -> bool:
+    revoked = local_cache.get(jti)
+    if revoked is not None:
+        return revoked
+
+    async with RedisClient().async_conn.pipeline(transaction=False) as pipe:
+        entry, ttl = await pipe.get(jti).ttl(jti).execute()
+    revoked = entry == "true"
+    local_cache.set(jti, revoked, ttl if revoked and ttl > 0 else None)
+    return revoked
+
+
+async def listen() -> None:
+    """
+    Applies revocations made by other instances to the local cache.
+    """
+    while True:
+        pubsub = RedisClient().async_conn.pubsub()
+        try:
+            await pubsub.subscribe(DENYLIST_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                jti, expires = message["data"].split()
+                local_cache.set(jti, True, int(expires))
+        except (ConnectionError, TimeoutError):
+            # Revocations may have been missed while disconnected
+            logger.warning("Denylist subscription lost, reconnecting")
+            local_cache.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
@@ -1,9 +1,11 @@
 from fastapi import HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi_jwt_auth import AuthJWT
-from .models import User
+from fastapi_jwt_auth.exceptions import RevokedTokenError
 from .config import settings
-from .services.user import get_by_id
+from .denylist import is_revoked
+from .principals import get_principal
+from .schemas.user import UserPrincipal
 
 
 @AuthJWT.load_config
@@ -20,22 +22,43 @@ class Auth(AuthJWT):
         self.check_token = check_token
         self._refresh = refresh
 
-    def __call__(self, req: Request = None, res: Response = None):
-        super().__init__(req, res)
-        if self.check_token:
-            if self._refresh:
-                self.jwt_refresh_token_required()
+    async def __call__(self, req: Request = None, res: Response = None):
+        # A fresh instance per request, the denylist lookup below awaits
+        # and concurrent requests would overwrite each other's claims
+        authorize = type(self)(self.check_token, self._refresh)
+        AuthJWT.__init__(authorize, req, res)
+        if authorize.check_token:
+            if authorize._refresh:
+                authorize.jwt_refresh_token_required()
             else:
-                self.jwt_required()
+                authorize.jwt_required()
 
-            self.raw_jwt = self.get_raw_jwt()
-            self.jti = self.raw_jwt.get("jti")
-            self.user_claims = self.raw_jwt.get("user_claims")
-        return self
+            authorize.raw_jwt = authorize.get_raw_jwt()
+            authorize.jti = authorize.raw_jwt.get("jti")
+            authorize.user_claims = authorize.raw_jwt.get("user_claims")
+            await authorize._check_token_is_revoked_async(authorize.raw_jwt)
+            if req is not None:
+                # Lets get_read_db send the user's reads to the primary
+                # right after their own writes
+                req.state.user_id = authorize.user_claims["id"]
+        return authorize
 
-    async def get_current_user(self, db: AsyncSession) -> User:
+    def _check_token_is_revoked(self, raw_token: dict) -> None:
+        # The library only supports a synchronous callback,
+        # the denylist is checked in __call__ instead
+        pass
+
+    async def _check_token_is_revoked_async(self, raw_token: dict) -> None:
+        if not self._denylist_enabled:
+            return
+        if raw_token["type"] not in self._denylist_token_checks:
+            return
+        if await is_revoked(raw_token["jti"]):
+            raise RevokedTokenError(status_code=401, message="Token has been revoked")
+
+    async def get_current_user(self, db: AsyncSession) -> UserPrincipal:
         user_id = self.user_claims["id"]
-        user = await get_by_id(db, user_id)
+        user = await get_principal(db, user_id)
         if not user:
             raise HTTPException(
                 status_code=401,
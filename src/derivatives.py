@@ -0,0 +1,124 @@
+"""
+Downsized copies of restored images for galleries and previews, one per
+DERIVATIVE_SIZES entry, in DERIVATIVE_FORMAT (webp or jpeg). Rendering runs
+in a process pool of the restoration worker, never in the request path.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image
+from .config import settings
+from .storage import (
+    derivative_key,
+    derivative_path,
+    derivative_url,
+    restored_path,
+    results_storage,
+)
+
+
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def render(
+    source: str, targets: dict[str, tuple[str, int]], fmt: str, quality: int
+) -> list[str]:
+    """
+    Writes `source` downsized to fit every target's maximum side.
+    Returns the names of the targets written or already present.
+    """
+    try:
+        image = Image.open(source)
+    except OSError:
+        return []
+
+    done = []
+    with image:
+        image = image.convert("RGB")
+        for name, (target, max_side) in targets.items():
+            if not os.path.exists(target):
+                derivative = image.copy()
+                derivative.thumbnail((max_side, max_side), Image.LANCZOS)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                derivative.save(f"{target}.partial", format=fmt, quality=quality)
+                os.replace(f"{target}.partial", target)
+            done.append(name)
+    return done
+
+
+def existing(content_hash: str) -> dict[str, str] | None:
+    """
+    Locations of derivatives already rendered for `content_hash`.
+    """
+    ext = EXTENSIONS[settings.DERIVATIVE_FORMAT]
+    storage = results_storage()
+    found = {
+        name: derivative_url(content_hash, name, ext)
+        for name in settings.DERIVATIVE_SIZES
+        if storage.exists(derivative_key(content_hash, name, ext))
+    }
+    return found or None
+
+
+def remove(content_hash: str) -> None:
+    ext = EXTENSIONS[settings.DERIVATIVE_FORMAT]
+    storage = results_storage()
+    for name in settings.DERIVATIVE_SIZES:
+        storage.delete(derivative_key(content_hash, name, ext))
+
+
+def publish(content_hash: str, names: list[str]) -> None:
+    """
+    Moves rendered derivatives to the results storage.
+    """
+    ext = EXTENSIONS[settings.DERIVATIVE_FORMAT]
+    storage = results_storage()
+    for name in names:
+        path = derivative_path(content_hash, name, ext)
+        storage.put_file(derivative_key(content_hash, name, ext), path)
+        if storage.remote:
+            os.remove(path)
+
+
+def executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.DERIVATIVE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+async def create(content_hash: str) -> dict[str, str]:
+    """
+    Renders derivatives of a restored image in the process pool and
+    returns their locations by size name.
+    """
+    ext = EXTENSIONS[settings.DERIVATIVE_FORMAT]
+    targets = {
+        name: (derivative_path(content_hash, name, ext), max_side)
+        for name, max_side in settings.DERIVATIVE_SIZES.items()
+    }
+    loop = asyncio.get_running_loop()
+    done = await loop.run_in_executor(
+        executor(),
+        render,
+        restored_path(content_hash),
+        targets,
+        settings.DERIVATIVE_FORMAT,
+        settings.DERIVATIVE_QUALITY,
+    )
+    await run_in_threadpool(publish, content_hash, done)
+    return {name: derivative_url(content_hash, name, ext) for name in done}
@@ -4,3 +4,11 @@ from enum import Enum
 class RoleEnum(Enum):
     user = "base user"
     admin = "administrator"
+
+
+class JobStatusEnum(Enum):
+    uploading = "uploading"
+    pending = "pending"
+    processing = "processing"
+    done = "done"
+    failed = "failed"
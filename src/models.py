@@ -8,11 +8,14 @@ from sqlalchemy import (
     column,
     text,
     Integer,
+    Index,
+    JSON,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 from src.db import Base
+from src.enums import JobStatusEnum
 
 
 class User(Base):
@@ -33,7 +36,12 @@ class User(Base):
         .select_from(text("roles")),
     )
     role = relationship("Role", back_populates="users", lazy="joined")
-    images = relationship("Image", back_populates="user", lazy="selectin")
+    images = relationship("Image", back_populates="user", lazy="raise")
+    jobs = relationship(
+        "Job", back_populates="user", lazy="noload", passive_deletes=True
+    )
+
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
 
 class Role(Base):
@@ -43,7 +51,7 @@ class Role(Base):
     name = Column(String, unique=True, nullable=False, index=True)
     description = Column(String)
     users = relationship(
-        "User", back_populates="role", order_by="User.created_at", lazy="selectin"
+        "User", back_populates="role", order_by="User.created_at", lazy="raise"
     )
 
 
@@ -53,6 +61,48 @@ class Image(Base):
     id = Column(Uuid, primary_key=True, default=uuid4)
     name = Column(String, nullable=False)
     size = Column(Integer, nullable=False)
-    location = Column(String, unique=True, nullable=False)
+    location = Column(String, nullable=False)
+    content_hash = Column(String, index=True)
+    original_width = Column(Integer)
+    original_height = Column(Integer)
+    processed_width = Column(Integer)
+    processed_height = Column(Integer)
+    derivatives = Column(JSON(none_as_null=True))
+    created_at = Column(
+        DateTime(timezone=True),
+        default=func.now(),
+        server_default=func.now(),
+        nullable=False,
+    )
     user_id = Column(Uuid, ForeignKey("users.id"), nullable=False)
-    user = relationship("User", back_populates="images", lazy="joined")
+    user = relationship("User", back_populates="images", lazy="raise")
+    job_id = Column(
+        Uuid, ForeignKey("jobs.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+    job = relationship("Job", back_populates="images", lazy="noload")
+
+    __table_args__ = (
+        Index("ix_images_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Uuid, primary_key=True, default=uuid4)
+    status = Column(
+        String, nullable=False, index=True, default=JobStatusEnum.uploading.value
+    )
+    input_dir = Column(String, nullable=False)
+    output_dir = Column(String, nullable=False)
+    error = Column(String)
+    claimed_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), onupdate=func.now(), default=func.now()
+    )
+    user_id = Column(
+        Uuid, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    user = relationship("User", back_populates="jobs", lazy="noload")
+    images = relationship("Image", back_populates="job", lazy="noload")
@@ -0,0 +1,71 @@
+"""
+Keyset pagination: pages are ordered by a unique tuple of columns and the
+next page starts right after the last row seen, so reading page N costs
+the same as reading the first one.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([str(value) for value in values])
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parsers: Sequence[Callable[[str], Any]]) -> list[Any]:
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        # encode_cursor only ever writes a list of strings
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError
+        if not all(isinstance(value, str) for value in values):
+            raise ValueError
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    limit: int,
+    after: Sequence[Any] | None = None,
+) -> Select:
+    """
+    Orders `query` by `keys` and limits it to one row more than a page,
+    the extra row tells whether there is a next page.
+    """
+    if after is not None:
+        query = query.where(tuple_(*keys) > tuple_(*after))
+    return query.order_by(*keys).limit(limit + 1)
+
+
+def page(
+    rows: Sequence[Any],
+    keys: Sequence[InstrumentedAttribute],
+    limit: int,
+    response: Response,
+) -> Sequence[Any]:
+    """
+    Drops the extra row fetched by `paginate` and points the next cursor
+    header at the last row of the page. Rows are objects or mappings.
+    """
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    last = rows[-1]
+    if isinstance(last, Mapping):
+        values = [last[key.key] for key in keys]
+    else:
+        values = [getattr(last, key.key) for key in keys]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(values)
+    return rows
@@ -0,0 +1,45 @@
+"""
+Normalizes inputs before restoration: one decode, EXIF orientation applied,
+RGB colour mode, downsized to a maximum side and written as PNG.
+"""
+import os
+from PIL import Image, ImageOps
+
+
+def normalize(
+    input_dir: str, filename: str, max_side: int
+) -> tuple[str, dict[str, int]] | None:
+    """
+    Replaces `filename` in `input_dir` with its canonical PNG.
+    Returns the new filename and original and processed dimensions,
+    or None when the file can't be decoded here.
+    """
+    path = os.path.join(input_dir, filename)
+    try:
+        image = Image.open(path)
+    except OSError:
+        return None
+
+    with image:
+        original_width, original_height = image.size
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba)
+        else:
+            image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+        canonical = f"{filename.split('.')[0]}.png"
+        temp_path = os.path.join(input_dir, f"{canonical}.partial")
+        image.save(temp_path, format="PNG")
+
+    os.remove(path)
+    os.replace(temp_path, os.path.join(input_dir, canonical))
+    return canonical, {
+        "original_width": original_width,
+        "original_height": original_height,
+        "processed_width": image.width,
+        "processed_height": image.height,
+    }
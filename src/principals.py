@@ -0,0 +1,49 @@
+"""
+Authenticated users are cached in process for PRINCIPAL_CACHE_LOCAL_TTL
+seconds and in Redis for PRINCIPAL_CACHE_TTL seconds. Updates and deletes
+drop both on the instance that made them, other instances may serve the
+old entry until their local copy expires.
+"""
+from uuid import UUID
+from sqlalchemy import select as sa_select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import LocalTTLCache
+from .config import settings
+from .models import User
+from .redis import RedisClient
+from .schemas.user import UserPrincipal
+
+
+PRINCIPAL_KEY_PREFIX = "principal:"
+
+local_cache = LocalTTLCache(
+    settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_LOCAL_TTL
+)
+
+
+async def get_principal(db: AsyncSession, user_id: UUID | str) -> UserPrincipal | None:
+    key = f"{PRINCIPAL_KEY_PREFIX}{user_id}"
+    principal = local_cache.get(key)
+    if principal is not None:
+        return principal
+
+    conn = RedisClient().async_conn
+    cached = await conn.get(key)
+    if cached:
+        principal = UserPrincipal.parse_raw(cached)
+    else:
+        user = (
+            await db.execute(sa_select(User).where(User.id == user_id))
+        ).scalar_one_or_none()
+        if not user:
+            return None
+        principal = UserPrincipal.from_orm(user)
+        await conn.setex(key, settings.PRINCIPAL_CACHE_TTL, principal.json())
+    local_cache.set(key, principal)
+    return principal
+
+
+async def invalidate(user_id: UUID | str) -> None:
+    key = f"{PRINCIPAL_KEY_PREFIX}{user_id}"
+    local_cache.delete(key)
+    await RedisClient().async_conn.delete(key)
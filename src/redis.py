@@ -1,4 +1,9 @@
 import redis
+import redis.asyncio
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+from redis.asyncio.retry import Retry
+from .config import settings
 
 
 class Singleton(type):
@@ -13,6 +18,20 @@ class Singleton(type):
 class RedisClient(metaclass=Singleton):
     def __init__(self, host="localhost", password=None):
         self.pool = redis.ConnectionPool(host=host, password=password, decode_responses=True)
+        # Request handlers wait for a free connection rather than fail on bursts
+        self.async_pool = redis.asyncio.BlockingConnectionPool(
+            host=host,
+            password=password,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+            retry_on_timeout=True,
+            retry=Retry(ExponentialBackoff(cap=1), settings.REDIS_RETRIES),
+            retry_on_error=[ConnectionError, TimeoutError],
+        )
 
     @property
     def conn(self):
@@ -20,9 +39,18 @@ class RedisClient(metaclass=Singleton):
             self.get_connection()
         return self._conn
 
+    @property
+    def async_conn(self):
+        if not hasattr(self, "_async_conn"):
+            self._async_conn = redis.asyncio.Redis(connection_pool=self.async_pool)
+        return self._async_conn
+
     def get_connection(self):
         self._conn = redis.Redis(connection_pool=self.pool)
 
+    async def close(self):
+        await self.async_pool.disconnect()
+
     # For testing
     def clear(self):
         if not hasattr(self, "_conn"):
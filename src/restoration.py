@@ -0,0 +1,206 @@
+import contextlib
+import importlib
+import multiprocessing
+import os
+import queue
+import runpy
+import sys
+import threading
+from collections.abc import Iterator
+from multiprocessing.connection import Connection
+
+
+RESTORATION_ARGS = ["--GPU", "-1", "--with_scratch"]
+# Hash of engine name to "<state>:<unix time of the report>"
+HEALTH_KEY = "restoration:engines"
+THREAD_LIMIT_VARIABLES = [
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+
+def _serve(
+    conn: Connection, workdir: str, warmup_modules: list[str], threads: int | None
+) -> None:
+    # Must be set before numeric libraries are imported to take effect,
+    # and is inherited by any subprocess run.py starts
+    if threads:
+        for variable in THREAD_LIMIT_VARIABLES:
+            os.environ[variable] = str(threads)
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+    for module in warmup_modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+    if threads and "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads)
+    conn.send(("ready",))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+
+        command = message[0]
+        if command == "stop":
+            break
+        if command == "ping":
+            conn.send(("pong",))
+            continue
+
+        _, input_dir, output_dir, args = message
+        sys.argv = [
+            "run.py",
+            "--input_folder",
+            input_dir,
+            "--output_folder",
+            output_dir,
+            *args,
+        ]
+        try:
+            runpy.run_path("run.py", run_name="__main__")
+        except SystemExit as exc:
+            if exc.code not in (None, 0):
+                conn.send(("error", f"Restoration exited with code {exc.code}"))
+                continue
+        except Exception as exc:
+            conn.send(("error", repr(exc)))
+            continue
+        finally:
+            os.chdir(workdir)
+        conn.send(("ok",))
+
+
+class RestorationEngine:
+    """
+    Long-lived process that keeps the interpreter and the heavy imports of
+    the restoration pipeline warm between jobs. Follows the `run.py` folder
+    contract, `run.py` itself still loads its models on every run.
+    """
+
+    def __init__(
+        self,
+        workdir: str,
+        warmup_modules: list[str] | None = None,
+        startup_timeout: float = 300,
+        threads: int | None = None,
+    ):
+        self.workdir = workdir
+        self.warmup_modules = warmup_modules or []
+        self.startup_timeout = startup_timeout
+        self.threads = threads
+        self._process: multiprocessing.Process | None = None
+        self._conn: Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def start(self) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_serve,
+            args=(child_conn, self.workdir, self.warmup_modules, self.threads),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        if not self._conn.poll(self.startup_timeout):
+            self.stop()
+            raise RuntimeError("Restoration engine did not start in time")
+        self._conn.recv()
+
+    def stop(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            self._conn.close()
+        if self._process is not None:
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.kill()
+        self._process = None
+        self._conn = None
+
+    def ping(self, timeout: float = 5) -> bool:
+        with self._lock:
+            if not self.alive:
+                return False
+            try:
+                self._conn.send(("ping",))
+                if self._conn.poll(timeout):
+                    return self._conn.recv() == ("pong",)
+            except (EOFError, BrokenPipeError, OSError):
+                pass
+            # A hung engine would answer late and desync the pipe
+            self.stop()
+            return False
+
+    def restore(self, input_dir: str, output_dir: str) -> None:
+        with self._lock:
+            if not self.alive:
+                self.stop()
+                self.start()
+            try:
+                self._conn.send(("restore", input_dir, output_dir, RESTORATION_ARGS))
+                reply = self._conn.recv()
+            except (EOFError, BrokenPipeError, OSError):
+                self.stop()
+                raise RuntimeError("Restoration engine died while processing")
+        if reply[0] == "error":
+            raise RuntimeError(reply[1])
+
+
+class EnginePool:
+    """
+    Fixed set of engines, usually one per group of CPU cores.
+    Callers borrow idle engines and may shard one batch across several.
+    """
+
+    def __init__(self, engines: list[RestorationEngine]):
+        self.engines = engines
+        self._idle = queue.Queue()
+        for engine in engines:
+            self._idle.put(engine)
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def start(self) -> None:
+        for engine in self.engines:
+            engine.start()
+
+    def stop(self) -> None:
+        for engine in self.engines:
+            engine.stop()
+
+    @contextlib.contextmanager
+    def acquire(self, wanted: int = 1) -> Iterator[list[RestorationEngine]]:
+        """
+        Waits for one idle engine and takes up to `wanted` in total
+        if more are idle at the moment.
+        """
+        engines = [self._idle.get()]
+        while len(engines) < wanted:
+            try:
+                engines.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            yield engines
+        finally:
+            for engine in engines:
+                self._idle.put(engine)
@@ -0,0 +1,122 @@
+import time
+from collections.abc import Awaitable, Callable
+from fastapi.concurrency import run_in_threadpool
+from redis import Redis
+from .storage import options_key, restored_key, restored_url, results_storage
+from . import derivatives
+
+
+class ResultCache:
+    """
+    Maps input content hashes to restored images for the current model
+    version and restoration flags. Restored files no image refers to are
+    evicted from storage in least recently used order once they take more
+    than `max_bytes`. Results images refer to are never evicted, so the
+    bound only covers results nothing references.
+    """
+
+    def __init__(self, conn: Redis, max_bytes: int, grace: float = 300):
+        self.conn = conn
+        self.max_bytes = max_bytes
+        # Images of a hit are recorded after the lookup, recent entries may
+        # be referenced without the database knowing yet
+        self.grace = grace
+        # Position in the LRU where the last eviction stopped
+        self._cursor = 0
+
+    @property
+    def namespace(self) -> str:
+        return f"results:{options_key()}"
+
+    def _key(self, content_hash: str) -> str:
+        return f"{self.namespace}:{content_hash}"
+
+    def get(self, content_hash: str) -> str | None:
+        location = self.conn.get(self._key(content_hash))
+        stored = results_storage().exists(restored_key(content_hash))
+        if location and not stored:
+            self._forget(content_hash)
+            location = None
+        if not location and stored:
+            # Restored before the cache knew about it
+            location = self.put(content_hash)
+        if not location:
+            self.conn.incr(f"{self.namespace}:misses")
+            return None
+
+        self.conn.incr(f"{self.namespace}:hits")
+        self.conn.zadd(f"{self.namespace}:lru", {content_hash: time.time()})
+        return location
+
+    def put(self, content_hash: str) -> str:
+        location = restored_url(content_hash)
+        size = results_storage().size(restored_key(content_hash))
+        previous = int(self.conn.hget(f"{self.namespace}:sizes", content_hash) or 0)
+        pipe = self.conn.pipeline()
+        pipe.set(self._key(content_hash), location)
+        pipe.zadd(f"{self.namespace}:lru", {content_hash: time.time()})
+        pipe.hset(f"{self.namespace}:sizes", content_hash, size)
+        pipe.incrby(f"{self.namespace}:bytes", size - previous)
+        pipe.execute()
+        return location
+
+    async def evict(
+        self,
+        referenced: Callable[[list[str]], Awaitable[set[str]]],
+        batch: int = 100,
+        pages: int = 10,
+    ) -> None:
+        """
+        Removes the oldest results until they fit into `max_bytes`.
+        `referenced` tells which of the given content hashes images still
+        point to, those are kept. Reads at most `pages` pages of `batch`
+        entries, the next call resumes after the kept ones and starts over
+        once it reached the end.
+        """
+        for _ in range(pages):
+            if await run_in_threadpool(self._bytes) <= self.max_bytes:
+                return
+            candidates = await run_in_threadpool(
+                self.conn.zrangebyscore,
+                f"{self.namespace}:lru",
+                "-inf",
+                time.time() - self.grace,
+                self._cursor,
+                batch,
+            )
+            if not candidates:
+                self._cursor = 0
+                return
+            kept = await referenced(candidates)
+            self._cursor += len(kept)
+            for content_hash in candidates:
+                if content_hash in kept:
+                    continue
+                if await run_in_threadpool(self._bytes) <= self.max_bytes:
+                    return
+                await run_in_threadpool(self._remove, content_hash)
+
+    def _remove(self, content_hash: str) -> None:
+        results_storage().delete(restored_key(content_hash))
+        derivatives.remove(content_hash)
+        self._forget(content_hash)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": int(self.conn.get(f"{self.namespace}:hits") or 0),
+            "misses": int(self.conn.get(f"{self.namespace}:misses") or 0),
+            "entries": self.conn.zcard(f"{self.namespace}:lru"),
+            "bytes": self._bytes(),
+        }
+
+    def _forget(self, content_hash: str) -> None:
+        size = int(self.conn.hget(f"{self.namespace}:sizes", content_hash) or 0)
+        pipe = self.conn.pipeline()
+        pipe.delete(self._key(content_hash))
+        pipe.zrem(f"{self.namespace}:lru", content_hash)
+        pipe.hdel(f"{self.namespace}:sizes", content_hash)
+        pipe.decrby(f"{self.namespace}:bytes", size)
+        pipe.execute()
+
+    def _bytes(self) -> int:
+        return int(self.conn.get(f"{self.namespace}:bytes") or 0)
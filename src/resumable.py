@@ -0,0 +1,102 @@
+"""
+Resumable uploads send one file in chunks, each appended at the offset the
+server reports, so a dropped connection only costs the chunk in flight.
+The state lives in Redis until UPLOAD_RESUMABLE_TTL seconds after the last
+chunk. Partial content is kept under INPUT_PATH/partial, so chunks of one
+upload must reach API instances sharing that folder.
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError
+from .config import settings
+from .redis import RedisClient
+from .schemas.upload import ResumableUploadState, UploadFileSpec
+
+
+RESUMABLE_KEY_PREFIX = "resumable_upload:"
+OFFSET_HEADER = "Upload-Offset"
+LENGTH_HEADER = "Upload-Length"
+
+
+def partial_dir() -> str:
+    return os.path.join(settings.INPUT_PATH, "partial")
+
+
+def partial_path(upload_id: UUID) -> str:
+    return os.path.join(partial_dir(), str(upload_id))
+
+
+def partial_size(upload_id: UUID) -> int:
+    """
+    Bytes received so far, -1 when the partial file is not on this instance.
+    """
+    try:
+        return os.path.getsize(partial_path(upload_id))
+    except FileNotFoundError:
+        return -1
+
+
+def expire_partials() -> None:
+    """
+    Removes partial files of uploads abandoned for longer than their state.
+    """
+    if not os.path.isdir(partial_dir()):
+        return
+    deadline = time.time() - settings.UPLOAD_RESUMABLE_TTL
+    for entry in os.scandir(partial_dir()):
+        if entry.stat().st_mtime < deadline:
+            os.remove(entry.path)
+
+
+async def save(upload: ResumableUploadState) -> None:
+    upload.expires_at = datetime.now(timezone.utc) + timedelta(
+        seconds=settings.UPLOAD_RESUMABLE_TTL
+    )
+    await RedisClient().async_conn.setex(
+        f"{RESUMABLE_KEY_PREFIX}{upload.id}",
+        settings.UPLOAD_RESUMABLE_TTL,
+        upload.json(),
+    )
+
+
+async def create(user_id: UUID, file: UploadFileSpec) -> ResumableUploadState:
+    upload = ResumableUploadState(
+        id=uuid4(), user_id=user_id, file=file, expires_at=datetime.now(timezone.utc)
+    )
+    os.makedirs(partial_dir(), exist_ok=True)
+    open(partial_path(upload.id), "wb").close()
+    await save(upload)
+    return upload
+
+
+async def get(upload_id: UUID) -> ResumableUploadState | None:
+    stored = await RedisClient().async_conn.get(f"{RESUMABLE_KEY_PREFIX}{upload_id}")
+    return ResumableUploadState.parse_raw(stored) if stored else None
+
+
+async def delete(upload_id: UUID) -> None:
+    await RedisClient().async_conn.delete(f"{RESUMABLE_KEY_PREFIX}{upload_id}")
+    if os.path.exists(partial_path(upload_id)):
+        os.remove(partial_path(upload_id))
+
+
+def lock(upload_id: UUID) -> Lock:
+    """
+    Serializes chunks and finalization of one upload.
+    """
+    return RedisClient().async_conn.lock(
+        f"{RESUMABLE_KEY_PREFIX}{upload_id}:lock",
+        timeout=settings.UPLOAD_RESUMABLE_LOCK_TIMEOUT,
+        blocking=False,
+    )
+
+
+async def release(lock: Lock) -> None:
+    try:
+        await lock.release()
+    except LockError:
+        # Held past its timeout, there is nothing left to release
+        pass
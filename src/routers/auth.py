@@ -3,26 +3,17 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..config import settings
 from ..db import get_db
-from fastapi_jwt_auth import AuthJWT
 from ..services.user import get_with_paswd
 from ..dependencies import Auth, base_auth, auth_checker, auth_checker_refresh
-from ..redis import RedisClient
+from ..denylist import revoke
 from ..schemas.auth import LoginOut
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
 
 auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
-redis_conn = RedisClient().conn
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-@AuthJWT.token_in_denylist_loader
-def check_if_token_in_denylist(decrypted_token: str) -> bool:
-    jti = decrypted_token["jti"]
-    entry = redis_conn.get(jti)
-    return entry and entry == "true"
-
-
 @auth_router.post("/login", response_model=LoginOut)
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
@@ -54,7 +45,7 @@ async def refresh_access_token(
     new_access_token = authorize.create_access_token(
         subject=current_user.username, user_claims=new_user_claims
     )
-    redis_conn.setex(authorize.jti, settings.AUTHJWT_REFRESH_TOKEN_EXPIRES, "true")
+    await revoke(authorize.jti, settings.AUTHJWT_REFRESH_TOKEN_EXPIRES)
     return {"access_token": new_access_token}
 
 
@@ -63,5 +54,4 @@ async def logout(
     authorize: Annotated[Auth, Depends(auth_checker)],
     z: Annotated[str, Depends(oauth2_scheme)],
 ):
-    jti = authorize.jti
-    redis_conn.setex(jti, settings.AUTHJWT_ACCESS_TOKEN_EXPIRES, "true")
+    await revoke(authorize.jti, settings.AUTHJWT_ACCESS_TOKEN_EXPIRES)
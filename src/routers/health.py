@@ -0,0 +1,30 @@
+import time
+from fastapi import APIRouter
+from ..config import settings
+from ..redis import RedisClient
+from ..restoration import HEALTH_KEY
+from ..schemas.health import HealthSchema
+
+
+health_router = APIRouter(prefix="/health", tags=["Health"])
+redis_conn = RedisClient().async_conn
+
+
+@health_router.get("", response_model=HealthSchema)
+async def get_health():
+    deadline = time.time() - settings.RESTORATION_HEALTH_TTL
+    engines, stale = {}, []
+    for name, report in (await redis_conn.hgetall(HEALTH_KEY)).items():
+        state, _, reported_at = report.rpartition(":")
+        if float(reported_at) < deadline:
+            stale.append(name)
+        else:
+            engines[name] = state
+    if stale:
+        # Engines of stopped workers, nobody reports them anymore
+        await redis_conn.hdel(HEALTH_KEY, *stale)
+    return {
+        "status": "ok",
+        "restoration_ready": any(state == "ok" for state in engines.values()),
+        "engines": engines,
+    }
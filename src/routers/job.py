@@ -0,0 +1,26 @@
+from typing import Annotated
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..schemas.job import JobSchema
+from ..services.job import get_by_id
+from ..db import get_db
+from ..dependencies import Auth, auth_checker
+from .auth import oauth2_scheme
+
+
+jobs_router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@jobs_router.get("/{job_id}", response_model=JobSchema)
+async def get_job(
+    job_id: UUID,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    authorize: Annotated[Auth, Depends(auth_checker)],
+    z: Annotated[str, Depends(oauth2_scheme)],
+):
+    current_user = await authorize.get_current_user(db)
+    job = await get_by_id(db, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from ..config import settings
+from ..db import session_manager
+from ..redis import RedisClient
+from ..result_cache import ResultCache
+from ..schemas.metrics import MetricsSchema
+
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"])
+redis_conn = RedisClient().conn
+result_cache = ResultCache(redis_conn, settings.RESULT_CACHE_MAX_BYTES)
+
+
+@metrics_router.get("", response_model=MetricsSchema)
+async def get_metrics():
+    return {
+        "result_cache": await run_in_threadpool(result_cache.stats),
+        "db_pool": session_manager.pool_stats(),
+    }
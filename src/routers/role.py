@@ -1,9 +1,10 @@
 from typing import Annotated
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..schemas.role import RoleSchemaBase
-from ..services.role import get_all
-from ..db import get_db
+from ..services.role import get_all, ROLE_PAGE_KEYS
+from ..pagination import decode_cursor, page
+from ..db import get_read_db
 from ..dependencies import auth_checker
 from .auth import oauth2_scheme
 
@@ -16,7 +17,10 @@ roles_router = APIRouter(prefix="/roles", tags=["Roles"])
 )
 async def get_all_roles(
     z: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(get_db)],
-    limit: int | None = Query(None, gt=0),
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    response: Response,
+    limit: int = Query(100, gt=0, le=1000),
+    after: str | None = None,
 ):
-    return await get_all(db, limit)
+    cursor = decode_cursor(after, (str,)) if after else None
+    return page(await get_all(db, limit, cursor), ROLE_PAGE_KEYS, limit, response)
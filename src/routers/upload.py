@@ -0,0 +1,339 @@
+import os
+from typing import Annotated
+from uuid import UUID, uuid4
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..schemas.job import JobCreated
+from ..schemas.upload import (
+    ResumableUploadSchema,
+    UploadFileSpec,
+    UploadSessionCreate,
+    UploadSessionSchema,
+    ResumableUploadState,
+    UploadSessionState,
+    UploadSlot,
+)
+from ..config import settings
+from ..db import get_db
+from ..dependencies import Auth, auth_checker
+from ..redis import RedisClient
+from ..result_cache import ResultCache
+from ..storage import (
+    adopt_upload,
+    image_extension,
+    originals_storage,
+    store_upload,
+    upload_key,
+)
+from ..uploads import append_stream, enqueue, file_hash, save_stream
+from ..workspace import workspace
+from .. import resumable, upload_sessions
+from .auth import oauth2_scheme
+
+
+uploads_router = APIRouter(prefix="/uploads", tags=["Uploads"])
+result_cache = ResultCache(RedisClient().conn, settings.RESULT_CACHE_MAX_BYTES)
+
+
+async def get_session(session_id: UUID, user_id: UUID) -> UploadSessionState:
+    session = await upload_sessions.get(session_id)
+    if not session or session.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+
+@uploads_router.post("", response_model=UploadSessionSchema, status_code=201)
+async def create_upload_session(
+    upload: UploadSessionCreate,
+    request: Request,
+    authorize: Annotated[Auth, Depends(auth_checker)],
+    z: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Hands out one upload slot per declared file. With a remote storage
+    slots carry presigned URLs, otherwise they point at `upload_file`.
+    Every file has to be sent, content stored before included: the
+    session proves its owner holds the bytes.
+    """
+    current_user = await authorize.get_current_user(db)
+    if len(upload.files) > settings.UPLOAD_SESSION_MAX_FILES:
+        raise HTTPException(status_code=400, detail="Too many files")
+    if any(file.size > settings.UPLOAD_MAX_FILE_SIZE for file in upload.files):
+        raise HTTPException(status_code=413, detail="File is too large")
+    if sum(file.size for file in upload.files) > settings.UPLOAD_MAX_REQUEST_SIZE:
+        raise HTTPException(status_code=413, detail="Upload is too large")
+
+    storage = originals_storage()
+    if not storage.remote:
+        await run_in_threadpool(upload_sessions.expire_uploads)
+    session = await upload_sessions.create(current_user.id, upload.files)
+    slots = []
+    for index, file in enumerate(upload.files):
+        if storage.remote:
+            key = upload_key(session.id, index, image_extension(file.filename))
+            url, headers = await run_in_threadpool(
+                storage.upload_url, key, file.size, file.content_hash
+            )
+        else:
+            url = str(
+                request.url_for(
+                    "upload_file", session_id=str(session.id), index=str(index)
+                )
+            )
+            headers = {}
+        slots.append(
+            UploadSlot(index=index, filename=file.filename, url=url, headers=headers)
+        )
+    return {"id": session.id, "expires_at": session.expires_at, "slots": slots}
+
+
+@uploads_router.put("/{session_id}/{index}", status_code=204)
+async def upload_file(
+    session_id: UUID,
+    index: int,
+    request: Request,
+    authorize: Annotated[Auth, Depends(auth_checker)],
+    z: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Stand-in for presigned URLs when originals are stored locally.
+    The body is the raw file content.
+    """
+    current_user = await authorize.get_current_user(db)
+    session = await get_session(session_id, current_user.id)
+    if originals_storage().remote:
+        raise HTTPException(status_code=409, detail="Upload to the presigned URL")
+    if not 0 <= index < len(session.files):
+        raise HTTPException(status_code=404, detail="Upload slot not found")
+
+    file = session.files[index]
+    with workspace(os.path.join(settings.INPUT_PATH, "incoming")) as upload_dir:
+        temp_location = os.path.join(upload_dir, str(uuid4()))
+        size, content_hash = await save_stream(
+            request.stream(), temp_location, file.size
+        )
+        if size != file.size or content_hash != file.content_hash:
+            raise HTTPException(
+                status_code=400, detail="Content does not match the declared file"
+            )
+        await run_in_threadpool(
+            originals_storage().put_file,
+            upload_key(session_id, index, image_extension(file.filename)),
+            temp_location,
+        )
+
+
+@uploads_router.post(
+    "/{session_id}/complete", response_model=JobCreated, status_code=202
+)
+async def complete_upload_session(
+    session_id: UUID,
+    authorize: Annotated[Auth, Depends(auth_checker)],
+    z: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Registers the uploaded files and enqueues their restoration.
+    Declared sizes are checked against the stored bytes.
+    """
+    current_user = await authorize.get_current_user(db)
+    user_id, username = current_user.id, current_user.username
+    session = await get_session(session_id, user_id)
+    storage = originals_storage()
+    files = []
+    for index, file in enumerate(session.files):
+        key = upload_key(session_id, index, image_extension(file.filename))
+        if not await run_in_threadpool(storage.exists, key):
+            raise HTTPException(
+                status_code=409, detail=f"{file.filename} is not uploaded"
+            )
+        size = await run_in_threadpool(storage.size, key)
+        if size != file.size:
+            await run_in_threadpool(storage.delete, key)
+            raise HTTPException(
+                status_code=400, detail=f"{file.filename} does not match its size"
+            )
+        files.append(file.copy(update={"size": size}))
+    if not await upload_sessions.claim(session_id):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    for index, file in enumerate(files):
+        ext = image_extension(file.filename)
+        await run_in_threadpool(
+            adopt_upload,
+            storage,
+            upload_key(session_id, index, ext),
+            file.content_hash,
+            ext,
+        )
+    return await enqueue(db, result_cache, user_id, username, files)
+
+
+async def get_resumable(upload_id: UUID, user_id: UUID) -> ResumableUploadState:
+    upload = await resumable.get(upload_id)
+    if not upload or upload.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+async def check_partial(upload: ResumableUploadState) -> None:
+    size = resumable.partial_size(upload.id)
+    if size < upload.offset:
+        # Expired or received by an instance without access to this one's files
+        await resumable.delete(upload.id)
+        raise HTTPException(status_code=410, detail="Upload is lost")
+    if size > upload.offset:
+        # Bytes past the recorded offset belong to no acknowledged chunk
+        os.truncate(resumable.partial_path(upload.id), upload.offset)
+
+
+def offset_headers(upload: ResumableUploadState) -> dict[str, str]:
+    return {
+        resumable.OFFSET_HEADER: str(upload.offset),
+        resumable.LENGTH_HEADER: str(upload.file.size),
+        "Cache-Control": "no-store",
+    }
+
+
+def resumable_schema(upload: ResumableUploadState) -> dict:
+    return {
+        "id": upload.id,
+        "filename": upload.file.filename,
+        "size": upload.file.size,
+        "offset": upload.offset,
+        "expires_at": upload.expires_at,
+    }
+
+
+@uploads_router.post(
+    "/resumable", response_model=ResumableUploadSchema, status_code=201
+)
+async def create_resumable_upload(
+    file: UploadFileSpec,
+    response: Response,
+    authorize: Annotated[Auth, Depends(auth_checker)],
+    z: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Starts a resumable upload of one file. Chunks are sent with
+    `upload_chunk` and the file is registered by `finalize_resumable_upload`.
+    """
+    current_user = await authorize.get_current_user(db)
+    if file.size > settings.UPLOAD_RESUMABLE_MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail="File is too large")
+    await run_in_threadpool(resumable.expire_partials)
+    upload = await resumable.create(current_user.id, file)
+    response.headers.update(offset_headers(upload))
+    return resumable_schema(upload)
+
+
+@uploads_router.head("/resumable/{upload_id}")
+async def get_resumable_offset(
+    upload_id: UUID,
+    authorize: Annotated[Auth, Depends(auth_checker)],
+    z: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    current_user = await authorize.get_current_user(db)
+    upload = await get_resumable(upload_id, current_user.id)
+    return Response(status_code=200, headers=offset_headers(upload))
+
+
+@uploads_router.patch("/resumable/{upload_id}", status_code=204)
+async def upload_chunk(
+    upload_id: UUID,
+    request: Request,
+    upload_offset: Annotated[int, Header()],
+    authorize: Annotated[Auth, Depends(auth_checker)],
+    z: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Appends the body to the upload. `Upload-Offset` has to match the
+    offset the server holds, a chunk cut off midway is kept up to where
+    it stopped.
+    """
+    current_user = await authorize.get_current_user(db)
+    await get_resumable(upload_id, current_user.id)
+    lock = resumable.lock(upload_id)
+    if not await lock.acquire():
+        raise HTTPException(status_code=409, detail="Upload is in progress")
+    try:
+        # Read again under the lock, a previous chunk may have moved it
+        upload = await get_resumable(upload_id, current_user.id)
+        if upload_offset != upload.offset:
+            raise HTTPException(
+                status_code=409,
+                detail="Upload offset mismatch",
+                headers=offset_headers(upload),
+            )
+        path = resumable.partial_path(upload_id)
+        await check_partial(upload)
+        max_size = min(
+            upload.file.size - upload.offset,
+            settings.UPLOAD_RESUMABLE_MAX_CHUNK_SIZE,
+        )
+        try:
+            await append_stream(request.stream(), path, max_size)
+        except ClientDisconnect:
+            pass
+        finally:
+            upload.offset = os.path.getsize(path)
+            await resumable.save(upload)
+    finally:
+        await resumable.release(lock)
+    return Response(status_code=204, headers=offset_headers(upload))
+
+
+@uploads_router.post(
+    "/resumable/{upload_id}/finalize", response_model=JobCreated, status_code=202
+)
+async def finalize_resumable_upload(
+    upload_id: UUID,
+    authorize: Annotated[Auth, Depends(auth_checker)],
+    z: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Checks the assembled file against its declared sha256, stores it and
+    enqueues its restoration. A file that doesn't match is discarded.
+    """
+    current_user = await authorize.get_current_user(db)
+    user_id, username = current_user.id, current_user.username
+    await get_resumable(upload_id, user_id)
+    lock = resumable.lock(upload_id)
+    if not await lock.acquire():
+        raise HTTPException(status_code=409, detail="Upload is in progress")
+    try:
+        upload = await get_resumable(upload_id, user_id)
+        if upload.offset != upload.file.size:
+            raise HTTPException(
+                status_code=409,
+                detail="Upload is incomplete",
+                headers=offset_headers(upload),
+            )
+        await check_partial(upload)
+        file, path = upload.file, resumable.partial_path(upload_id)
+        content_hash = await run_in_threadpool(
+            file_hash, path, settings.UPLOAD_CHUNK_SIZE
+        )
+        if content_hash != file.content_hash:
+            await resumable.delete(upload_id)
+            raise HTTPException(
+                status_code=400, detail="Content does not match the declared file"
+            )
+        await run_in_threadpool(
+            store_upload,
+            originals_storage(),
+            path,
+            content_hash,
+            image_extension(file.filename),
+        )
+        await resumable.delete(upload_id)
+    finally:
+        await resumable.release(lock)
+    return await enqueue(db, result_cache, user_id, username, [file])
@@ -1,40 +1,68 @@
 import asyncio
 import concurrent.futures
 import os
-import aiofiles
-from ..security import hash_file_name, process_images, clear_dir
+from datetime import datetime
+from uuid import UUID, uuid4
+from ..uploads import enqueue, save_upload
+from ..workspace import workspace
+from ..storage import (
+    image_extension,
+    original_key,
+    originals_storage,
+    store_upload,
+)
+from ..result_cache import ResultCache
 from typing import Annotated
+from fastapi.concurrency import run_in_threadpool
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
     Query,
+    Response,
     UploadFile,
-    BackgroundTasks,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..schemas.user import UserSchemaCreate, UserSchema, UserSchemaUpdate
+from ..schemas.user import (
+    UserSchemaCreate,
+    UserSchema,
+    UserSchemaPartial,
+    UserSchemaUpdate,
+)
 from ..schemas.image import ImageBase
-from ..services.user import create, update, delete, get_all, get_by_username
-from ..services.image import create as create_img
-from ..services.image import delete as delete_img
+from ..schemas.job import JobCreated
+from ..schemas.upload import UploadFileSpec
+from ..services.user import (
+    create,
+    update,
+    delete,
+    get_all,
+    get_all_fields,
+    get_by_username,
+    USER_FIELDS,
+    USER_PAGE_KEYS,
+)
+from ..services.image import get_by_user as get_user_images_by_id
+from ..services.image import IMAGE_PAGE_KEYS
+from ..pagination import decode_cursor, page
 from ..config import settings
-from ..db import get_db
+from ..db import get_db, get_read_db, mark_write
 from ..dependencies import Auth, auth_checker
 from ..redis import RedisClient
+from ..denylist import revoke
 from .auth import oauth2_scheme
-from fastapi.concurrency import run_in_threadpool
 
 
 users_router = APIRouter(prefix="/users", tags=["Users"])
 redis_conn = RedisClient().conn
+result_cache = ResultCache(redis_conn, settings.RESULT_CACHE_MAX_BYTES)
 
 
 @users_router.get("/me", response_model=UserSchema)
 async def get_current_user(
-    db: Annotated[AsyncSession, Depends(get_db)],
     authorize: Annotated[Auth, Depends(auth_checker)],
     z: Annotated[str, Depends(oauth2_scheme)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
 ):
     return await authorize.get_current_user(db)
 
@@ -46,15 +74,34 @@ async def create_user(
     new_user = await create(db, user)
     if not new_user:
         raise HTTPException(status_code=400, detail="User already exists")
+    await mark_write(new_user.id)
     return new_user
 
 
-@users_router.get("", response_model=list[UserSchema])
+@users_router.get(
+    "", response_model=list[UserSchemaPartial], response_model_exclude_unset=True
+)
 async def get_all_users(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    limit: int | None = Query(None, gt=0),
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    response: Response,
+    limit: int = Query(100, gt=0, le=1000),
+    after: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated user fields"),
 ):
-    return await get_all(db, limit)
+    cursor = decode_cursor(after, (datetime.fromisoformat, UUID)) if after else None
+    if not fields:
+        return page(await get_all(db, limit, cursor), USER_PAGE_KEYS, limit, response)
+
+    requested = set(fields.split(","))
+    if unknown := requested - set(USER_FIELDS):
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    rows = await get_all_fields(db, requested, limit, cursor)
+    return [
+        {field: value for field, value in row.items() if field in requested}
+        for row in page(rows, USER_PAGE_KEYS, limit, response)
+    ]
 
 
 @users_router.get(
@@ -62,7 +109,7 @@ async def get_all_users(
 )
 async def get_user(
     username: str,
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     z: Annotated[str, Depends(oauth2_scheme)],
 ):
     user = await get_by_username(db, username=username)
@@ -92,6 +139,7 @@ async def update_user(
     if not any(new_user_data.values()):
         raise HTTPException(status_code=400)
 
+    await mark_write(current_user.id)
     return await update(db, payload, existed_user)
 
 
@@ -111,68 +159,78 @@ async def delete_user(
     if not existed_user.id == current_user.id:
         raise HTTPException(status_code=405)
 
-    redis_conn.setex(authorize.jti, settings.AUTHJWT_REFRESH_TOKEN_EXPIRES, "true")
+    await revoke(authorize.jti, settings.AUTHJWT_REFRESH_TOKEN_EXPIRES)
+    await mark_write(current_user.id)
     return await delete(db, existed_user)
 
 
-@users_router.post("/upload_image")
+@users_router.post("/upload_image", response_model=JobCreated, status_code=202)
 async def create_upload_image(
     authorize: Annotated[Auth, Depends(auth_checker)],
     files: list[UploadFile],
     z: Annotated[str, Depends(oauth2_scheme)],
     db: Annotated[AsyncSession, Depends(get_db)],
-    background_tasks: BackgroundTasks,
 ):
     current_user = await authorize.get_current_user(db)
-    files_data = []
-    file_dir = f"/tmp/input_images/{current_user.id}"
-    clear_dir(file_dir)
-    for file in files:
+    originals = originals_storage()
+    uploaded, stored = [], []
+    request_budget = settings.UPLOAD_MAX_REQUEST_SIZE
+    with workspace(os.path.join(settings.INPUT_PATH, "incoming")) as upload_dir:
         try:
-            filename = hash_file_name(file.filename)
-            file_ext = file.filename.split(".")[-1]
-            file_content = await file.read()
-            if file_ext == "jpeg":
-                file_url = f"/static/user_images/{current_user.id}/final_output/{filename}..png"
-            else:
-                file_url = f"/static/user_images/{current_user.id}/final_output/{filename}.png"
-            file_location = os.path.join(file_dir, f"{filename}.{file_ext}")
-            os.makedirs(file_dir, exist_ok=True)
-            async with aiofiles.open(file_location, "wb+") as image_file:
-                file_data = {
-                    "name": file.filename,
-                    "size": file.size,
-                    "location": file_url,
-                    "user_id": current_user.id,
-                }
-                await image_file.write(file_content)
-                await create_img(db, file_data)
-            files_data.append(
-                {
-                    "filename": file.filename,
-                    "file_size": file.size,
-                    "file_location": file_url,
-                }
+            for file in files:
+                try:
+                    try:
+                        file_ext = image_extension(file.filename)
+                    except ValueError as e:
+                        raise HTTPException(status_code=400, detail=str(e))
+                    temp_location = os.path.join(upload_dir, str(uuid4()))
+                    file_size, content_hash = await save_upload(
+                        file,
+                        temp_location,
+                        min(settings.UPLOAD_MAX_FILE_SIZE, request_budget),
+                        settings.UPLOAD_CHUNK_SIZE,
+                        "File is too large"
+                        if settings.UPLOAD_MAX_FILE_SIZE <= request_budget
+                        else "Upload is too large",
+                    )
+                finally:
+                    await file.close()
+                request_budget -= file_size
+                created = await run_in_threadpool(
+                    store_upload, originals, temp_location, content_hash, file_ext
+                )
+                if created:
+                    stored.append(original_key(content_hash, file_ext))
+                # Measured here, only the name is the client's
+                uploaded.append(
+                    UploadFileSpec.construct(
+                        filename=file.filename,
+                        size=file_size,
+                        content_hash=content_hash,
+                    )
+                )
+            return await enqueue(
+                db, result_cache, current_user.id, current_user.username, uploaded
             )
-        except Exception:
-            await delete_img(db, file_data)
-            return {"detail": "Something went wrong"}
-        finally:
-            await file.close()
-
-    await run_in_threadpool(process_images, file_dir)
-    return {
-        "files_data": files_data,
-        "user": current_user.username,
-    }
+        except Exception as e:
+            # Nothing of a failed upload is kept, originals it added included
+            for key in stored:
+                await run_in_threadpool(originals.delete, key)
+            if isinstance(e, HTTPException):
+                raise
+            raise HTTPException(status_code=500, detail="Something went wrong")
 
 
 @users_router.get("/images/results", response_model=list[ImageBase])
 async def get_user_images(
     authorize: Annotated[Auth, Depends(auth_checker)],
     z: Annotated[str, Depends(oauth2_scheme)],
-    db: Annotated[AsyncSession, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    response: Response,
+    limit: int = Query(50, gt=0, le=500),
+    after: str | None = None,
 ):
     current_user = await authorize.get_current_user(db)
-    files_data = current_user.images
-    return files_data
+    cursor = decode_cursor(after, (datetime.fromisoformat, UUID)) if after else None
+    images = await get_user_images_by_id(db, current_user.id, limit, cursor)
+    return page(images, IMAGE_PAGE_KEYS, limit, response)
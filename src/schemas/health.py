@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class HealthSchema(BaseModel):
+    status: str
+    restoration_ready: bool
+    engines: dict[str, str]
@@ -5,6 +5,11 @@ class ImageBase(BaseModel):
     name: str
     size: int
     location: str
+    original_width: int | None
+    original_height: int | None
+    processed_width: int | None
+    processed_height: int | None
+    derivatives: dict[str, str] | None
 
     class Config:
         orm_mode = True
@@ -16,3 +21,11 @@ class ImageSchema(BaseModel):
     size: int
     location: str
     user_id: str
+
+
+class UploadedImage(BaseModel):
+    filename: str
+    file_size: int
+    file_location: str
+    content_hash: str
+    cached: bool
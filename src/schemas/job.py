@@ -0,0 +1,26 @@
+from pydantic import BaseModel, UUID4, validator
+from datetime import datetime
+from .image import UploadedImage
+
+
+class JobSchema(BaseModel):
+    id: UUID4
+    status: str
+    error: str | None
+    created_at: str
+    updated_at: str
+
+    @validator("created_at", "updated_at", pre=True)
+    def parse_dates(cls, value):
+        return datetime.strftime(value, "%X %d.%m.%Y %Z")
+
+    class Config:
+        orm_mode = True
+
+
+class JobCreated(BaseModel):
+    job_id: UUID4
+    status: str
+    cache_hits: int
+    files_data: list[UploadedImage]
+    user: str
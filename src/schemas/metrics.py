@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+
+
+class ResultCacheStats(BaseModel):
+    hits: int
+    misses: int
+    entries: int
+    bytes: int
+
+
+class DatabasePoolStats(BaseModel):
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class MetricsSchema(BaseModel):
+    result_cache: ResultCacheStats
+    db_pool: DatabasePoolStats
@@ -0,0 +1,55 @@
+from datetime import datetime
+from pydantic import BaseModel, UUID4, Field, validator
+from ..storage import image_extension
+
+
+class UploadFileSpec(BaseModel):
+    filename: str = Field(min_length=1, max_length=255)
+    size: int = Field(gt=0)
+    content_hash: str = Field(regex="^[0-9a-f]{64}$")
+
+    @validator("filename")
+    def is_image(cls, value: str) -> str:
+        image_extension(value)
+        return value
+
+
+class UploadSessionCreate(BaseModel):
+    files: list[UploadFileSpec] = Field(min_items=1)
+
+
+class UploadSessionState(BaseModel):
+    id: UUID4
+    user_id: UUID4
+    files: list[UploadFileSpec]
+    expires_at: datetime
+
+
+class UploadSlot(BaseModel):
+    index: int
+    filename: str
+    url: str
+    method: str = "PUT"
+    headers: dict[str, str] = {}
+
+
+class UploadSessionSchema(BaseModel):
+    id: UUID4
+    expires_at: datetime
+    slots: list[UploadSlot]
+
+
+class ResumableUploadState(BaseModel):
+    id: UUID4
+    user_id: UUID4
+    file: UploadFileSpec
+    offset: int = 0
+    expires_at: datetime
+
+
+class ResumableUploadSchema(BaseModel):
+    id: UUID4
+    filename: str
+    size: int
+    offset: int
+    expires_at: datetime
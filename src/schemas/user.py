@@ -31,6 +31,35 @@ class UserSchema(BaseModel):
         orm_mode = True
 
 
+class UserSchemaPartial(UserSchema):
+    """
+    Users listed with a `fields` projection, only requested fields are set.
+    """
+
+    id: UUID4 | None
+    username: str | None
+    role: "RoleSchemaBase | None" = Field(exclude={"id"})
+    created_at: str | None
+    updated_at: str | None
+
+
+class UserPrincipal(BaseModel):
+    """
+    Authenticated user as cached between requests.
+    """
+
+    id: UUID4
+    username: str
+    role: "RoleSchemaBase"
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
 from .role import RoleSchemaBase
 
 UserSchema.update_forward_refs()
+UserSchemaPartial.update_forward_refs()
+UserPrincipal.update_forward_refs()
@@ -1,9 +1,11 @@
-import datetime
-import subprocess
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException
 from passlib.context import CryptContext
-from hashlib import shake_256
 from pathlib import Path
 import shutil
+from .config import settings
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -17,27 +19,57 @@ def get_password_hash(raw_password: str) -> str:
     return pwd_context.hash(raw_password)
 
 
-def hash_file_name(filename: str):
-    return shake_256(
-        (filename + datetime.datetime.now().strftime("%m/%d/%Y, %H:%M:%S:%f")).encode()
-    ).hexdigest(8)
-
-
-def process_images(file_dir: str):
-    user_id = file_dir.split("/")[-1]
-    commands = [
-        "python",
-        "run.py",
-        "--input_folder",
-        file_dir,
-        "--output_folder",
-        f"/data/user_images/{user_id}",
-        "--GPU",
-        "-1",
-        "--with_scratch",
-    ]
-    proc = subprocess.Popen(commands, cwd="/image-restoration/neural_link")
-    proc.wait()
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so it neither blocks the event
+    loop nor competes for the GIL. Calls beyond `max_pending` waiting or
+    running are rejected with 503 instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many authentication requests, try again later",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def verify(self, raw_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, raw_password, hashed_password)
+
+    async def hash(self, raw_password: str) -> str:
+        return await self._run(get_password_hash, raw_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING
+)
 
 
 def clear_dir(dir: str) -> None:
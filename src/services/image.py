@@ -1,16 +1,102 @@
+from collections.abc import Sequence
+from datetime import datetime
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert as sa_insert
+from sqlalchemy import select as sa_select
+from sqlalchemy import update as sa_update
 from ..models import Image
+from ..pagination import paginate
 
 
-async def create(db: AsyncSession, image: dict[str, str | int]) -> Image | None:
-    db_image = Image(**image)
-    db.add(db_image)
+IMAGE_PAGE_KEYS = (Image.created_at, Image.id)
+IMAGE_DIMENSIONS = (
+    Image.original_width,
+    Image.original_height,
+    Image.processed_width,
+    Image.processed_height,
+)
+
+
+async def create_many(
+    db: AsyncSession, images: list[dict[str, str | int]]
+) -> Sequence[Image]:
+    """
+    Inserts all rows with one INSERT ... RETURNING in a single transaction,
+    either every image is stored or none.
+    """
+    if not images:
+        return []
+    try:
+        db_images = (await db.scalars(sa_insert(Image).returning(Image), images)).all()
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return db_images
+
+
+async def set_dimensions(
+    db: AsyncSession, content_hash: str, dimensions: dict[str, int]
+) -> None:
+    query = (
+        sa_update(Image).where(Image.content_hash == content_hash).values(dimensions)
+    )
+    await db.execute(query)
     await db.commit()
-    await db.refresh(db_image)
-    return db_image
 
 
-async def delete(db: AsyncSession, image: dict[str, str | int]) -> None:
-    db_image = Image(**image)
-    await db.delete(db_image)
+async def set_derivatives(
+    db: AsyncSession, content_hash: str, derivatives: dict[str, str]
+) -> None:
+    query = (
+        sa_update(Image)
+        .where(Image.content_hash == content_hash)
+        .values(derivatives=derivatives)
+    )
+    await db.execute(query)
     await db.commit()
+
+
+async def get_dimensions(db: AsyncSession, content_hash: str) -> dict[str, int | None]:
+    """
+    Dimensions recorded for `content_hash` by its restoration, all None
+    when none were recorded.
+    """
+    query = (
+        sa_select(*IMAGE_DIMENSIONS)
+        .where(Image.content_hash == content_hash, Image.original_width.is_not(None))
+        .limit(1)
+    )
+    row = (await db.execute(query)).first()
+    values = row or (None,) * len(IMAGE_DIMENSIONS)
+    return {column.key: value for column, value in zip(IMAGE_DIMENSIONS, values)}
+
+
+async def referenced_hashes(db: AsyncSession, content_hashes: list[str]) -> set[str]:
+    query = (
+        sa_select(Image.content_hash)
+        .where(Image.content_hash.in_(content_hashes))
+        .distinct()
+    )
+    return set((await db.execute(query)).scalars().all())
+
+
+async def get_by_job(db: AsyncSession, job_id: UUID) -> Sequence[Image]:
+    query = sa_select(Image).where(Image.job_id == job_id)
+    return (await db.execute(query)).scalars().all()
+
+
+async def get_by_user(
+    db: AsyncSession,
+    user_id: UUID,
+    limit: int,
+    after: tuple[datetime, UUID] | None = None,
+) -> Sequence[Image]:
+    """
+    One page of the user's images, oldest first, plus the first row
+    of the next page if there is one.
+    """
+    query = sa_select(Image).where(Image.user_id == user_id)
+    query = paginate(query, IMAGE_PAGE_KEYS, limit, after)
+    return (await db.execute(query)).scalars().all()
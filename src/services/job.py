@@ -0,0 +1,103 @@
+import os
+from collections.abc import Sequence
+from datetime import timedelta
+from uuid import UUID, uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, or_, update as sa_update
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import select as sa_select
+from ..models import Image, Job
+from ..enums import JobStatusEnum
+from ..config import settings
+from ..storage import restored_dir
+
+
+async def create(db: AsyncSession, user_id: UUID) -> Job:
+    job_id = uuid4()
+    db_job = Job(
+        id=job_id,
+        user_id=user_id,
+        input_dir=os.path.join(settings.INPUT_PATH, str(job_id)),
+        output_dir=restored_dir(),
+    )
+    db.add(db_job)
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+
+async def get_by_id(db: AsyncSession, job_id: UUID | str) -> Job | None:
+    return await db.get(Job, job_id)
+
+
+async def set_status(
+    db: AsyncSession, job: Job, status: JobStatusEnum, error: str | None = None
+) -> Job:
+    job.status = status.value
+    job.error = error
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def claim_next(db: AsyncSession) -> Job | None:
+    """
+    Atomically takes the oldest pending job and marks it as processing.
+    Concurrent workers skip rows already locked by each other. Jobs whose
+    worker stopped renewing its claim for JOB_LEASE_TIMEOUT are taken over.
+    """
+    expired = func.now() - timedelta(seconds=settings.JOB_LEASE_TIMEOUT)
+    query = (
+        sa_select(Job)
+        .where(
+            or_(
+                Job.status == JobStatusEnum.pending.value,
+                and_(
+                    Job.status == JobStatusEnum.processing.value,
+                    Job.claimed_at < expired,
+                ),
+            )
+        )
+        .order_by(Job.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    db_job = (await db.execute(query)).scalar_one_or_none()
+    if not db_job:
+        await db.commit()
+        return None
+    db_job.status = JobStatusEnum.processing.value
+    db_job.claimed_at = func.now()
+    await db.commit()
+    await db.refresh(db_job)
+    return db_job
+
+
+async def renew_claims(db: AsyncSession, job_ids: Sequence[UUID]) -> None:
+    query = (
+        sa_update(Job)
+        .where(Job.id.in_(job_ids), Job.status == JobStatusEnum.processing.value)
+        .values(claimed_at=func.now())
+    )
+    await db.execute(query)
+    await db.commit()
+
+
+async def expire_uploading(db: AsyncSession, ttl: float) -> Sequence[Job]:
+    """
+    Deletes jobs left uploading for more than `ttl` seconds together with
+    their images. Returns the deleted jobs.
+    """
+    expired = func.now() - timedelta(seconds=ttl)
+    query = (
+        sa_select(Job)
+        .where(Job.status == JobStatusEnum.uploading.value, Job.created_at < expired)
+        .with_for_update(skip_locked=True)
+    )
+    db_jobs = (await db.scalars(query)).all()
+    if db_jobs:
+        job_ids = [db_job.id for db_job in db_jobs]
+        await db.execute(sa_delete(Image).where(Image.job_id.in_(job_ids)))
+        await db.execute(sa_delete(Job).where(Job.id.in_(job_ids)))
+    await db.commit()
+    return db_jobs
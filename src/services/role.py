@@ -3,7 +3,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from collections.abc import Sequence
 from sqlalchemy import select as sa_select
 from sqlalchemy import update as sa_update
+from ..pagination import paginate
 
 
-async def get_all(db: AsyncSession, bound: int | None = None) -> Sequence[Role]:
-    return (await db.execute(sa_select(Role).limit(bound))).scalars().all()
+# Roles have no timestamps, the unique name orders them
+ROLE_PAGE_KEYS = (Role.name,)
+
+
+async def get_all(
+    db: AsyncSession, limit: int, after: tuple[str] | None = None
+) -> Sequence[Role]:
+    query = paginate(sa_select(Role), ROLE_PAGE_KEYS, limit, after)
+    return (await db.execute(query)).scalars().all()
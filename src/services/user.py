@@ -1,17 +1,26 @@
-from src.models import User
+from src.models import Role, User
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy import select as sa_select
 from sqlalchemy import update as sa_update
 from ..schemas.user import UserSchemaCreate, UserSchemaUpdate
-from ..security import get_password_hash, verify_password
+from ..security import password_hasher
+from ..principals import invalidate
 from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+from ..pagination import paginate
+
+
+USER_PAGE_KEYS = (User.created_at, User.id)
+USER_FIELDS = ("id", "username", "role", "created_at", "updated_at")
 
 
 async def create(db: AsyncSession, user: UserSchemaCreate) -> User | None:
     if await get_by_username(db, user.username):
         return None
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     db_user = User(username=user.username, hashed_password=hashed_password)
     db.add(db_user)
     await db.commit()
@@ -22,20 +31,24 @@ async def create(db: AsyncSession, user: UserSchemaCreate) -> User | None:
 async def update(db: AsyncSession, payload: UserSchemaUpdate, user: User) -> User:
     update_data = payload.dict(exclude_none=True, exclude_unset=True)
     if update_data.get("password"):
-        hashed_passwd = get_password_hash(update_data.get("password"))
+        hashed_passwd = await password_hasher.hash(update_data.get("password"))
         update_data["hashed_password"] = hashed_passwd
         update_data.pop("password")
 
+    user_id = user.id
     query = sa_update(User).where(User.username == user.username).values(update_data)
     await db.execute(query)
     await db.commit()
+    await invalidate(user_id)
     await db.refresh(user)
     return user
 
 
 async def delete(db: AsyncSession, user: User) -> None:
+    user_id = user.id
     await db.delete(user)
     await db.commit()
+    await invalidate(user_id)
 
 
 async def get_with_paswd(db: AsyncSession, user: UserSchemaCreate) -> User | None:
@@ -43,7 +56,9 @@ async def get_with_paswd(db: AsyncSession, user: UserSchemaCreate) -> User | Non
         db_user = (
             await db.execute(sa_select(User).where((User.username == user.username)))
         ).scalar()
-        if not db_user or not verify_password(user.password, db_user.hashed_password):
+        if not db_user or not await password_hasher.verify(
+            user.password, db_user.hashed_password
+        ):
             raise NoResultFound
         return db_user
     except NoResultFound:
@@ -56,12 +71,40 @@ async def get_by_username(db: AsyncSession, username: str) -> User | None:
     ).scalar_one_or_none()
 
 
-async def get_all(db: AsyncSession, bound: int | None = None) -> Sequence[User]:
-    return (
-        (await db.execute(sa_select(User).limit(bound).order_by(User.created_at)))
-        .scalars()
-        .all()
-    )
+async def get_all(
+    db: AsyncSession,
+    limit: int,
+    after: tuple[datetime, UUID] | None = None,
+) -> Sequence[User]:
+    query = paginate(sa_select(User), USER_PAGE_KEYS, limit, after)
+    return (await db.execute(query)).scalars().all()
+
+
+async def get_all_fields(
+    db: AsyncSession,
+    fields: set[str],
+    limit: int,
+    after: tuple[datetime, UUID] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Like `get_all`, but selects only `fields` (and the page keys) as plain
+    rows. The roles table is only joined when "role" is requested.
+    """
+    columns = {key.key: key for key in USER_PAGE_KEYS}
+    columns |= {
+        field: getattr(User, field)
+        for field in fields
+        if field in USER_FIELDS and field != "role"
+    }
+    query = sa_select(*columns.values())
+    if "role" in fields:
+        query = query.add_columns(Role).join(Role, User.role_id == Role.id)
+    query = paginate(query, USER_PAGE_KEYS, limit, after)
+    rows = [dict(row) for row in (await db.execute(query)).mappings()]
+    if "role" in fields:
+        for row in rows:
+            row["role"] = row.pop("Role")
+    return rows
 
 
 async def get_by_id(db: AsyncSession, user_id: int | str) -> User | None:
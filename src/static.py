@@ -0,0 +1,225 @@
+"""
+Serves `/static`. Restored images and their derivatives are named by content
+hash under a model version key and never change, so they get strong ETags
+and immutable caching. Other files are revalidated on every use.
+
+Single byte ranges are honoured, precompressed `.br`/`.gz` siblings are
+preferred when the client accepts them and bodies go out through the ASGI
+zero-copy send extension when the server offers it. Behind nginx, setting
+STATIC_ACCEL_REDIRECT_PREFIX hands the transfer itself to nginx. With a
+remote storage backend, results are redirected to their storage URL.
+"""
+import os
+import stat
+from email.utils import formatdate
+from hashlib import shake_256
+from mimetypes import guess_type
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import RedirectResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+from .config import settings
+from .storage import results_storage
+
+
+IMMUTABLE_DIRS = {"restored"}
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+ZERO_COPY_EXTENSION = "http.response.zerocopysend"
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    First and last byte of a single `bytes=` range, None when the header
+    should be ignored and the whole file sent.
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        return None
+    start, sep, end = ranges.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not start:
+            length = int(end)
+            if length <= 0:
+                raise RangeNotSatisfiable
+            return max(0, size - length), size - 1
+        first = int(start)
+        last = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return None
+    if first >= size or last < first:
+        raise RangeNotSatisfiable
+    return first, last
+
+
+class FileRangeResponse(Response):
+    """
+    Sends `count` bytes of a file from `offset`.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        offset: int,
+        count: int,
+        headers: dict[str, str],
+        method: str,
+        status_code: int = 200,
+    ):
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.send_body = method != "HEAD"
+        self.status_code = status_code
+        self.background = None
+        self.init_headers({**headers, "content-length": str(count)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if not self.send_body or not self.count:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if ZERO_COPY_EXTENSION in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send(
+                    {
+                        "type": ZERO_COPY_EXTENSION,
+                        "file": file.fileno(),
+                        "offset": self.offset,
+                        "count": self.count,
+                    }
+                )
+            return
+
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": bool(remaining),
+                    }
+                )
+            if remaining:
+                await send({"type": "http.response.body", "body": b""})
+
+
+class ImageFiles(StaticFiles):
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        storage = results_storage()
+        if storage.remote and path.split(os.sep)[0] in IMMUTABLE_DIRS:
+            # Results live in the remote store, clients fetch them from there
+            return RedirectResponse(
+                storage.url(path.replace(os.sep, "/")),
+                status_code=307,
+                headers={
+                    "cache-control": f"private, max-age={settings.S3_URL_EXPIRY // 2}"
+                },
+            )
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        relative = os.path.relpath(full_path, os.path.realpath(self.directory))
+        immutable = relative.split(os.sep)[0] in IMMUTABLE_DIRS
+
+        path, encoding = full_path, None
+        accepted = request_headers.get("accept-encoding", "")
+        for name, suffix in PRECOMPRESSED:
+            if name in accepted:
+                try:
+                    variant = os.stat(full_path + suffix)
+                except OSError:
+                    continue
+                if stat.S_ISREG(variant.st_mode):
+                    path, encoding, stat_result = full_path + suffix, name, variant
+                    break
+
+        headers = {
+            "content-type": guess_type(full_path)[0] or "application/octet-stream",
+            "accept-ranges": "bytes",
+            "etag": self.etag(relative, stat_result, encoding, immutable),
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "vary": "Accept-Encoding",
+            "cache-control": (
+                f"public, max-age={settings.STATIC_MAX_AGE}, immutable"
+                if immutable
+                else "no-cache"
+            ),
+        }
+        if encoding:
+            headers["content-encoding"] = encoding
+        if self.is_not_modified(Headers(headers), request_headers):
+            return NotModifiedResponse(Headers(headers))
+
+        if settings.STATIC_ACCEL_REDIRECT_PREFIX:
+            accel_path = os.path.relpath(path, os.path.realpath(self.directory))
+            headers["x-accel-redirect"] = (
+                settings.STATIC_ACCEL_REDIRECT_PREFIX.rstrip("/")
+                + "/"
+                + accel_path.replace(os.sep, "/")
+            )
+            return Response(status_code=status_code, headers=headers)
+
+        size = stat_result.st_size
+        byte_range = None
+        if "range" in request_headers and request_headers.get(
+            "if-range", headers["etag"]
+        ) in (headers["etag"], headers["last-modified"]):
+            try:
+                byte_range = parse_range(request_headers["range"], size)
+            except RangeNotSatisfiable:
+                return Response(
+                    status_code=416, headers={"content-range": f"bytes */{size}"}
+                )
+        if byte_range is None:
+            return FileRangeResponse(
+                path, 0, size, headers, scope["method"], status_code
+            )
+
+        first, last = byte_range
+        headers["content-range"] = f"bytes {first}-{last}/{size}"
+        return FileRangeResponse(
+            path, first, last - first + 1, headers, scope["method"], 206
+        )
+
+    @staticmethod
+    def etag(
+        relative: str,
+        stat_result: os.stat_result,
+        encoding: str | None,
+        immutable: bool,
+    ) -> str:
+        if immutable:
+            # The path names the content, so it identifies the bytes
+            key = f"{relative}:{stat_result.st_size}:{encoding}"
+            return f'"{shake_256(key.encode()).hexdigest(8)}"'
+        tag = f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"
+        return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
@@ -0,0 +1,377 @@
+"""
+Where uploaded originals, restored images and their derivatives live.
+
+Files are addressed by keys relative to a storage root. The local backend
+keeps results under STATIC_PATH and originals under INPUT_PATH, the "s3"
+backend keeps both in one S3-compatible bucket and hands out presigned
+URLs, so neither API replicas nor workers need a shared volume for them.
+The restoration worker still renders into its local folders first and
+publishes the results afterwards.
+"""
+import base64
+import os
+import shutil
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from functools import lru_cache
+from hashlib import shake_256
+from mimetypes import guess_type
+from uuid import UUID
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from .config import settings
+from .restoration import RESTORATION_ARGS
+
+
+class Storage(ABC):
+    """
+    Object store addressed by relative keys.
+    """
+
+    # Files of a remote store are not readable from the local filesystem
+    remote = False
+
+    @abstractmethod
+    def put_file(self, key: str, path: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_file(self, key: str, path: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def move(self, key: str, target: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def upload_url(
+        self, key: str, size: int, content_hash: str
+    ) -> tuple[str, dict[str, str]]:
+        """
+        URL and headers a client uploads `key` with, bypassing the API.
+        """
+        raise NotImplementedError
+
+
+class LocalStorage(Storage):
+    def __init__(self, root: str, base_url: str | None = None):
+        self.root = root
+        self.base_url = base_url
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def put_file(self, key: str, path: str) -> None:
+        target = self.path(key)
+        if os.path.abspath(path) == os.path.abspath(target):
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(path, f"{target}.partial")
+        os.replace(f"{target}.partial", target)
+
+    def get_file(self, key: str, path: str) -> None:
+        source = self.path(key)
+        if os.path.abspath(path) == os.path.abspath(source):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.link(source, path)
+        except OSError:
+            shutil.copyfile(source, path)
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.path(key))
+
+    def delete(self, key: str) -> None:
+        if os.path.exists(self.path(key)):
+            os.remove(self.path(key))
+
+    def move(self, key: str, target: str) -> None:
+        os.makedirs(os.path.dirname(self.path(target)), exist_ok=True)
+        os.replace(self.path(key), self.path(target))
+
+    def url(self, key: str) -> str:
+        if self.base_url is None:
+            raise ValueError(f"{self.root} is not served")
+        return f"{self.base_url}/{key}"
+
+    def upload_url(
+        self, key: str, size: int, content_hash: str
+    ) -> tuple[str, dict[str, str]]:
+        # Local uploads go through the API, see routers.upload.upload_file
+        raise ValueError(f"{self.root} takes no direct uploads")
+
+
+class S3Storage(Storage):
+    """
+    S3-compatible bucket (AWS, MinIO, Ceph). Large files are transferred
+    in parts of `part_size` bytes, downloads go through presigned URLs.
+    """
+
+    remote = True
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: str | None = None,
+        region: str | None = None,
+        access_key_id: str | None = None,
+        secret_access_key: str | None = None,
+        url_expiry: int = 3600,
+        part_size: int = 8 * 1024 * 1024,
+    ):
+        self.bucket = bucket
+        self.url_expiry = url_expiry
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+        )
+        self.transfer = TransferConfig(
+            multipart_threshold=part_size, multipart_chunksize=part_size
+        )
+
+    def put_file(self, key: str, path: str) -> None:
+        content_type = guess_type(key)[0] or "application/octet-stream"
+        self.client.upload_file(
+            path,
+            self.bucket,
+            key,
+            Config=self.transfer,
+            ExtraArgs={"ContentType": content_type},
+        )
+
+    def get_file(self, key: str, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.client.download_file(
+            self.bucket, key, f"{path}.partial", Config=self.transfer
+        )
+        os.replace(f"{path}.partial", path)
+
+    def _head(self, key: str) -> dict | None:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def size(self, key: str) -> int:
+        return self._head(key)["ContentLength"]
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def move(self, key: str, target: str) -> None:
+        # Buckets have no rename, the object is copied within the bucket
+        self.client.copy(
+            {"Bucket": self.bucket, "Key": key},
+            self.bucket,
+            target,
+            Config=self.transfer,
+        )
+        self.delete(key)
+
+    def url(self, key: str) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=self.url_expiry,
+        )
+
+    def upload_url(
+        self, key: str, size: int, content_hash: str
+    ) -> tuple[str, dict[str, str]]:
+        # The bucket rejects bodies of another length or sha256
+        checksum = base64.b64encode(bytes.fromhex(content_hash)).decode()
+        content_type = guess_type(key)[0] or "application/octet-stream"
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ContentLength": size,
+                "ContentType": content_type,
+                "ChecksumSHA256": checksum,
+            },
+            ExpiresIn=self.url_expiry,
+        )
+        return url, {"Content-Type": content_type, "x-amz-checksum-sha256": checksum}
+
+
+@lru_cache
+def _s3_storage() -> S3Storage:
+    return S3Storage(
+        settings.S3_BUCKET,
+        settings.S3_ENDPOINT_URL,
+        settings.S3_REGION,
+        settings.S3_ACCESS_KEY_ID,
+        settings.S3_SECRET_ACCESS_KEY,
+        settings.S3_URL_EXPIRY,
+        settings.S3_PART_SIZE,
+    )
+
+
+# Extensions originals are accepted and stored with
+IMAGE_EXTENSIONS = {"bmp", "gif", "jpeg", "jpg", "png", "tif", "tiff", "webp"}
+
+
+def image_extension(filename: str) -> str:
+    """
+    Lower-cased extension of an uploaded file. Names without one of
+    IMAGE_EXTENSIONS raise ValueError, so they never reach keys or paths.
+    """
+    stem, _, ext = filename.rpartition(".")
+    if not stem or ext.lower() not in IMAGE_EXTENSIONS:
+        raise ValueError(f"{filename} is not a supported image")
+    return ext.lower()
+
+
+# Remote backends by STORAGE_BACKEND name, one store for every kind of file
+BACKENDS: dict[str, Callable[[], Storage]] = {"s3": _s3_storage}
+
+
+def results_storage() -> Storage:
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.STATIC_PATH, "/static")
+    return BACKENDS[settings.STORAGE_BACKEND]()
+
+
+def originals_storage() -> Storage:
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.INPUT_PATH)
+    return BACKENDS[settings.STORAGE_BACKEND]()
+
+
+def options_key(args: list[str] = RESTORATION_ARGS) -> str:
+    """
+    Identifies everything that changes the output for the same input:
+    the model, its arguments, preprocessing and tiling.
+    """
+    options = " ".join(
+        [
+            settings.RESTORATION_MODEL_VERSION,
+            *args,
+            f"max_side={settings.PREPROCESS_MAX_SIDE}",
+            f"tile={settings.TILE_SIZE}/{settings.TILE_OVERLAP}",
+        ]
+    )
+    return shake_256(options.encode()).hexdigest(4)
+
+
+def original_key(content_hash: str, ext: str) -> str:
+    return f"originals/{content_hash[:2]}/{content_hash}.{ext}"
+
+
+def upload_key(session_id: UUID, index: int, ext: str) -> str:
+    return f"uploads/{session_id}/{index}.{ext}"
+
+
+def original_path(content_hash: str, ext: str) -> str:
+    return os.path.join(settings.INPUT_PATH, original_key(content_hash, ext))
+
+
+def restored_key(content_hash: str) -> str:
+    return f"restored/{options_key()}/{content_hash}.png"
+
+
+def restored_dir() -> str:
+    return os.path.join(settings.STATIC_PATH, "restored", options_key())
+
+
+def restored_path(content_hash: str) -> str:
+    return os.path.join(settings.STATIC_PATH, restored_key(content_hash))
+
+
+def restored_url(content_hash: str) -> str:
+    return f"/static/{restored_key(content_hash)}"
+
+
+def derivative_key(content_hash: str, name: str, ext: str) -> str:
+    return f"restored/{options_key()}/{name}/{content_hash}.{ext}"
+
+
+def derivative_path(content_hash: str, name: str, ext: str) -> str:
+    return os.path.join(settings.STATIC_PATH, derivative_key(content_hash, name, ext))
+
+
+def derivative_url(content_hash: str, name: str, ext: str) -> str:
+    return f"/static/{derivative_key(content_hash, name, ext)}"
+
+
+def store_original(temp_path: str, content_hash: str, ext: str) -> tuple[str, bool]:
+    """
+    Moves a freshly uploaded file under its content hash.
+    Identical content already stored is kept and the new copy dropped.
+    Returns the stored path and whether this upload created it.
+    """
+    path = original_path(content_hash, ext)
+    if os.path.exists(path):
+        os.remove(temp_path)
+        return path, False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(temp_path, path)
+    return path, True
+
+
+def store_upload(storage: Storage, temp_path: str, content_hash: str, ext: str) -> bool:
+    """
+    Stores a freshly uploaded file as the original of `content_hash`.
+    A remote store keeps the only copy, the local file is dropped either
+    way. Returns whether this upload created the original.
+    """
+    if not storage.remote:
+        return store_original(temp_path, content_hash, ext)[1]
+    key = original_key(content_hash, ext)
+    try:
+        if storage.exists(key):
+            return False
+        storage.put_file(key, temp_path)
+        return True
+    finally:
+        os.remove(temp_path)
+
+
+def adopt_upload(storage: Storage, key: str, content_hash: str, ext: str) -> bool:
+    """
+    Turns a file uploaded under `key` into the original of `content_hash`.
+    Identical content already stored is kept and the upload dropped.
+    Returns whether this upload created the original.
+    """
+    if storage.exists(original_key(content_hash, ext)):
+        storage.delete(key)
+        return False
+    storage.move(key, original_key(content_hash, ext))
+    return True
+
+
+def link_input(path: str, input_dir: str) -> None:
+    os.makedirs(input_dir, exist_ok=True)
+    target = os.path.join(input_dir, os.path.basename(path))
+    if not os.path.exists(target):
+        os.link(path, target)
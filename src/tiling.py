@@ -0,0 +1,113 @@
+"""
+Splits oversized scans into overlapping tiles before restoration and
+blends restored tiles back, so the model only ever sees `tile_size` pixels.
+"""
+import os
+from dataclasses import dataclass, field
+from PIL import Image, ImageChops
+
+
+@dataclass
+class Tile:
+    name: str
+    box: tuple[int, int, int, int]
+
+
+@dataclass
+class TiledImage:
+    filename: str
+    size: tuple[int, int]
+    tiles: list[Tile] = field(default_factory=list)
+
+
+def _positions(length: int, tile_size: int, overlap: int) -> list[int]:
+    if length <= tile_size:
+        return [0]
+    step = tile_size - overlap
+    return [*range(0, length - tile_size, step), length - tile_size]
+
+
+def split(
+    input_dir: str, filename: str, tile_size: int, overlap: int
+) -> TiledImage | None:
+    """
+    Replaces an image larger than `tile_size` with its tiles in `input_dir`.
+    Returns None when the image is small enough to be restored whole.
+    """
+    path = os.path.join(input_dir, filename)
+    try:
+        image = Image.open(path)
+    except OSError:
+        # Not decodable here, left for the restoration step to judge
+        return None
+    with image:
+        width, height = image.size
+        if max(width, height) <= tile_size:
+            return None
+
+        tiled = TiledImage(filename, (width, height))
+        stem = filename.split(".")[0]
+        image = image.convert("RGB")
+        for top in _positions(height, tile_size, overlap):
+            for left in _positions(width, tile_size, overlap):
+                box = (
+                    left,
+                    top,
+                    min(left + tile_size, width),
+                    min(top + tile_size, height),
+                )
+                tile = Tile(f"{stem}_t{len(tiled.tiles)}.png", box)
+                image.crop(box).save(os.path.join(input_dir, tile.name))
+                tiled.tiles.append(tile)
+    os.remove(path)
+    return tiled
+
+
+def _mask(size: tuple[int, int], left: bool, top: bool, overlap: int) -> "Image.Image":
+    """
+    Opaque mask fading in over `overlap` pixels on edges shared with
+    tiles pasted earlier.
+    """
+    width, height = size
+    mask = Image.new("L", size, 255)
+    ramp = Image.linear_gradient("L")
+    if top:
+        mask.paste(ramp.resize((width, min(overlap, height))), (0, 0))
+    if left:
+        side = ramp.rotate(90, expand=True).resize((min(overlap, width), height))
+        mask = ImageChops.multiply(mask, _pad(side, size))
+    return mask
+
+
+def _pad(image: "Image.Image", size: tuple[int, int]) -> "Image.Image":
+    padded = Image.new("L", size, 255)
+    padded.paste(image, (0, 0))
+    return padded
+
+
+def blend(tiled: TiledImage, restored_dir: str, target: str, overlap: int) -> bool:
+    """
+    Blends restored tiles into `target`. Restoration may rescale its output,
+    the scale of the first tile is applied to the whole image.
+    Returns False if any tile has no restored result.
+    """
+    restored = [os.path.join(restored_dir, tile.name) for tile in tiled.tiles]
+    if not all(os.path.exists(path) for path in restored):
+        return False
+
+    with Image.open(restored[0]) as first:
+        left, top, right, bottom = tiled.tiles[0].box
+        scale = first.width / (right - left)
+    width, height = (round(side * scale) for side in tiled.size)
+    canvas = Image.new("RGB", (width, height))
+    for tile, path in zip(tiled.tiles, restored):
+        left, top, right, bottom = (round(side * scale) for side in tile.box)
+        with Image.open(path) as restored_tile:
+            restored_tile = restored_tile.convert("RGB").resize(
+                (right - left, bottom - top)
+            )
+            mask = _mask(restored_tile.size, left > 0, top > 0, round(overlap * scale))
+            canvas.paste(restored_tile, (left, top), mask)
+        os.remove(path)
+    canvas.save(target)
+    return True
@@ -0,0 +1,65 @@
+"""
+Upload sessions let clients send files straight to storage instead of
+through the API. A session records the declared files of one upload and
+lives in Redis for UPLOAD_SESSION_TTL seconds, completing it consumes it.
+Files are uploaded under uploads/<session>/ and become originals once the
+session completes. Uploads of sessions never completed are removed by
+`expire_uploads` locally, a bucket needs a lifecycle rule on that prefix.
+"""
+import os
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+from .config import settings
+from .redis import RedisClient
+from .schemas.upload import UploadFileSpec, UploadSessionState
+
+
+UPLOAD_SESSION_KEY_PREFIX = "upload_session:"
+
+
+def expire_uploads() -> None:
+    """
+    Removes local uploads of sessions expired without completing.
+    """
+    uploads_dir = os.path.join(settings.INPUT_PATH, "uploads")
+    if not os.path.isdir(uploads_dir):
+        return
+    deadline = time.time() - settings.UPLOAD_SESSION_TTL
+    for entry in os.scandir(uploads_dir):
+        if entry.stat().st_mtime < deadline:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+async def create(user_id: UUID, files: list[UploadFileSpec]) -> UploadSessionState:
+    session = UploadSessionState(
+        id=uuid4(),
+        user_id=user_id,
+        files=files,
+        expires_at=datetime.now(timezone.utc)
+        + timedelta(seconds=settings.UPLOAD_SESSION_TTL),
+    )
+    await RedisClient().async_conn.setex(
+        f"{UPLOAD_SESSION_KEY_PREFIX}{session.id}",
+        settings.UPLOAD_SESSION_TTL,
+        session.json(),
+    )
+    return session
+
+
+async def get(session_id: UUID) -> UploadSessionState | None:
+    stored = await RedisClient().async_conn.get(
+        f"{UPLOAD_SESSION_KEY_PREFIX}{session_id}"
+    )
+    return UploadSessionState.parse_raw(stored) if stored else None
+
+
+async def claim(session_id: UUID) -> bool:
+    """
+    Ends a session. Only one of concurrent callers gets True.
+    """
+    deleted = await RedisClient().async_conn.delete(
+        f"{UPLOAD_SESSION_KEY_PREFIX}{session_id}"
+    )
+    return bool(deleted)
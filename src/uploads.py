@@ -0,0 +1,224 @@
+import os
+from collections.abc import AsyncIterator
+from hashlib import sha256
+from uuid import UUID
+import aiofiles
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+from .db import mark_write
+from .derivatives import existing as existing_derivatives
+from .enums import JobStatusEnum
+from .result_cache import ResultCache
+from .schemas.upload import UploadFileSpec
+from .services.image import IMAGE_DIMENSIONS
+from .services.image import create_many as create_images
+from .services.image import get_dimensions as get_image_dimensions
+from .services.job import create as create_job
+from .services.job import set_status as set_job_status
+from .storage import (
+    image_extension,
+    link_input,
+    original_path,
+    originals_storage,
+    restored_url,
+)
+from .workspace import publish, workspace
+
+
+class RequestSizeLimit:
+    """
+    Rejects multipart uploads to `paths` larger than UPLOAD_MAX_REQUEST_SIZE
+    before they are parsed and spooled: by Content-Length up front, or as
+    soon as that many bytes arrived when the length is not declared.
+    """
+
+    def __init__(self, app: ASGIApp, paths: set[str]):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Boundaries and part headers come on top of the file content
+        max_size = settings.UPLOAD_MAX_REQUEST_SIZE + settings.UPLOAD_MULTIPART_OVERHEAD
+        length = Headers(scope=scope).get("content-length", "")
+        if length.isdigit() and int(length) > max_size:
+            response = JSONResponse({"detail": "Upload is too large"}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            if received > max_size:
+                raise HTTPException(status_code=413, detail="Upload is too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def save_upload(
+    file: UploadFile,
+    location: str,
+    max_size: int,
+    chunk_size: int,
+    too_large: str = "File is too large",
+) -> tuple[int, str]:
+    """
+    Streams an uploaded file to `location` chunk by chunk.
+    Returns the size in bytes and the sha256 hex digest of its content.
+    """
+
+    async def chunks() -> AsyncIterator[bytes]:
+        while chunk := await file.read(chunk_size):
+            yield chunk
+
+    return await save_stream(chunks(), location, max_size, too_large)
+
+
+async def save_stream(
+    chunks: AsyncIterator[bytes],
+    location: str,
+    max_size: int,
+    too_large: str = "File is too large",
+) -> tuple[int, str]:
+    """
+    Writes a request body to `location` as it arrives.
+    Returns the size in bytes and the sha256 hex digest of its content.
+    """
+    size = 0
+    content_hash = sha256()
+    try:
+        async with aiofiles.open(location, "wb") as image_file:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(status_code=413, detail=too_large)
+                content_hash.update(chunk)
+                await image_file.write(chunk)
+    except BaseException:
+        if os.path.exists(location):
+            os.remove(location)
+        raise
+    return size, content_hash.hexdigest()
+
+
+async def append_stream(
+    chunks: AsyncIterator[bytes], location: str, max_size: int
+) -> int:
+    """
+    Appends a request body to `location` as it arrives and returns the
+    number of bytes written. A body over `max_size` is rolled back,
+    an interrupted one keeps what arrived.
+    """
+    start = os.path.getsize(location) if os.path.exists(location) else 0
+    written = 0
+    async with aiofiles.open(location, "ab") as partial:
+        try:
+            async for chunk in chunks:
+                written += len(chunk)
+                if written > max_size:
+                    raise HTTPException(status_code=413, detail="Chunk is too large")
+                await partial.write(chunk)
+        except HTTPException:
+            await partial.truncate(start)
+            raise
+    return written
+
+
+def file_hash(location: str, chunk_size: int) -> str:
+    content_hash = sha256()
+    with open(location, "rb") as file:
+        while chunk := file.read(chunk_size):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+async def enqueue(
+    db: AsyncSession,
+    cache: ResultCache,
+    user_id: UUID,
+    username: str,
+    files: list[UploadFileSpec],
+) -> dict:
+    """
+    Registers stored originals as images of a new job and queues those
+    not restored before. With a remote storage the worker fetches the
+    inputs itself.
+    """
+    storage = originals_storage()
+    job = await create_job(db, user_id)
+    job_id, job_dir = job.id, job.input_dir
+    files_data, images = [], []
+    queued = cache_hits = 0
+    with workspace(os.path.join(settings.INPUT_PATH, "incoming")) as upload_dir:
+        inputs_dir = os.path.join(upload_dir, "inputs")
+        try:
+            for file in files:
+                content_hash, ext = file.content_hash, image_extension(file.filename)
+                file_url = await run_in_threadpool(cache.get, content_hash)
+                cached = file_url is not None
+                derivatives = None
+                dimensions = dict.fromkeys(column.key for column in IMAGE_DIMENSIONS)
+                if cached:
+                    cache_hits += 1
+                    derivatives = await run_in_threadpool(
+                        existing_derivatives, content_hash
+                    )
+                    dimensions = await get_image_dimensions(db, content_hash)
+                else:
+                    if not storage.remote:
+                        link_input(original_path(content_hash, ext), inputs_dir)
+                    queued += 1
+                    file_url = restored_url(content_hash)
+                images.append(
+                    {
+                        "name": file.filename,
+                        "size": file.size,
+                        "location": file_url,
+                        "content_hash": content_hash,
+                        "derivatives": derivatives,
+                        **dimensions,
+                        "user_id": user_id,
+                        "job_id": job_id,
+                    }
+                )
+                files_data.append(
+                    {
+                        "filename": file.filename,
+                        "file_size": file.size,
+                        "file_location": file_url,
+                        "content_hash": content_hash,
+                        "cached": cached,
+                    }
+                )
+            await create_images(db, images)
+        except Exception as e:
+            await set_job_status(db, job, JobStatusEnum.failed)
+            if isinstance(e, HTTPException):
+                raise
+            raise HTTPException(status_code=500, detail="Something went wrong")
+
+        if queued and not storage.remote:
+            publish(inputs_dir, job_dir)
+        await set_job_status(
+            db, job, JobStatusEnum.pending if queued else JobStatusEnum.done
+        )
+    await mark_write(user_id)
+    return {
+        "job_id": job_id,
+        "status": job.status,
+        "cache_hits": cache_hits,
+        "files_data": files_data,
+        "user": username,
+    }
@@ -0,0 +1,386 @@
+"""
+Restoration worker. Consumes pending jobs from the `jobs` table
+independently of the API process:
+
+    python -m src.worker
+"""
+import asyncio
+import logging
+import math
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from uuid import UUID
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import settings
+from .db import session_manager
+from .enums import JobStatusEnum
+from .models import Job
+from .batching import stage, route, shard, merge, restored_name
+from .tiling import split, blend
+from .preprocessing import normalize
+from .redis import RedisClient
+from .restoration import RestorationEngine, EnginePool, HEALTH_KEY
+from .result_cache import ResultCache
+from .security import clear_dir
+from .workspace import workspace
+from .services.job import claim_next, expire_uploading, renew_claims, set_status
+from .services.image import (
+    get_by_job,
+    get_dimensions,
+    referenced_hashes,
+    set_derivatives,
+    set_dimensions,
+)
+from .storage import (
+    image_extension,
+    original_key,
+    originals_storage,
+    restored_key,
+    restored_path,
+    results_storage,
+)
+from . import derivatives, upload_sessions
+
+
+logger = logging.getLogger(__name__)
+missing_error = RuntimeError("Restoration produced no output for some images")
+
+
+async def report_health(name: str, engine: RestorationEngine) -> None:
+    # A busy engine is alive by definition, pinging it would wait for the job
+    healthy = engine.busy or await run_in_threadpool(engine.ping)
+    await RedisClient().async_conn.hset(
+        HEALTH_KEY, name, f"{'ok' if healthy else 'down'}:{time.time()}"
+    )
+
+
+async def monitor(engines: dict[str, RestorationEngine], interval: float) -> None:
+    while True:
+        for name, engine in engines.items():
+            try:
+                await report_health(name, engine)
+            except Exception:
+                logger.exception("Unable to report health of %s", name)
+        await asyncio.sleep(interval)
+
+
+async def collect_batch(
+    db: AsyncSession, max_size: int, max_wait: float
+) -> dict[Job, dict[str, str]]:
+    """
+    Claims pending jobs until the batch holds `max_size` images or
+    `max_wait` seconds passed since the first job was claimed.
+    Returns the inputs of every job as content hash to filename.
+    """
+    loop = asyncio.get_running_loop()
+    inputs, size, deadline = {}, 0, None
+    while size < max_size:
+        job = await claim_next(db)
+        if job:
+            try:
+                job_inputs, restored = await fetch_inputs(db, job)
+                await adopt_results(db, restored)
+            except Exception as exc:
+                logger.exception("Inputs of job %s are unavailable", job.id)
+                await set_status(db, job, JobStatusEnum.failed, error=str(exc))
+                continue
+            if restored and not job_inputs:
+                # Nothing left for the engine
+                await set_status(db, job, JobStatusEnum.done)
+                continue
+            inputs[job] = job_inputs
+            size += len(job_inputs)
+            deadline = deadline or loop.time() + max_wait
+            continue
+        if not inputs or loop.time() >= deadline:
+            break
+        await asyncio.sleep(min(0.02, deadline - loop.time()))
+    return inputs
+
+
+async def fetch_inputs(db: AsyncSession, job: Job) -> tuple[dict[str, str], list[str]]:
+    """
+    Finds the inputs of a job in its folder by the content hashes of its
+    images. Inputs of a job uploaded through another node are downloaded
+    first, those restored in the meantime are skipped. Returns the inputs
+    as content hash to filename and the content hashes skipped.
+    """
+    storage = originals_storage()
+    download = storage.remote and not os.path.isdir(job.input_dir)
+    inputs, restored = {}, []
+    try:
+        for image in await get_by_job(db, job.id):
+            content_hash = image.content_hash
+            key = original_key(content_hash, image_extension(image.name))
+            filename = os.path.basename(key)
+            path = os.path.join(job.input_dir, filename)
+            if download and not os.path.exists(path):
+                if await run_in_threadpool(
+                    results_storage().exists, restored_key(content_hash)
+                ):
+                    restored.append(content_hash)
+                    continue
+                await run_in_threadpool(storage.get_file, key, path)
+            if os.path.exists(path):
+                inputs[content_hash] = filename
+    except Exception:
+        if download:
+            clear_dir(job.input_dir)
+        raise
+    return inputs, restored
+
+
+async def adopt_results(db: AsyncSession, content_hashes: list[str]) -> None:
+    """
+    Gives images of results restored by other jobs their derivatives and
+    dimensions.
+    """
+    for content_hash in content_hashes:
+        locations = await run_in_threadpool(derivatives.existing, content_hash)
+        if locations:
+            await set_derivatives(db, content_hash, locations)
+        dimensions = await get_dimensions(db, content_hash)
+        if dimensions["original_width"] is not None:
+            await set_dimensions(db, content_hash, dimensions)
+
+
+def publish(content_hash: str) -> None:
+    """
+    Moves a restored image to the results storage. Jobs of one batch
+    share results, only the first to finish finds the local file.
+    """
+    path = restored_path(content_hash)
+    if not os.path.exists(path):
+        return
+    storage = results_storage()
+    storage.put_file(restored_key(content_hash), path)
+
+
+def restore_batch(
+    pool: EnginePool, inputs: dict[Job, dict[str, str]]
+) -> tuple[set[Job], dict[str, dict[str, int]]]:
+    """
+    Restores a batch, sharding it across as many idle engines as its size
+    justifies. Returns jobs with missing results and image dimensions
+    before and after preprocessing by content hash.
+    """
+    with workspace(settings.BATCH_ROOT) as batch_dir:
+        input_dir = os.path.join(batch_dir, "input")
+        routes, staged = stage(inputs, input_dir)
+        dimensions = {}
+        for content_hash, filename in list(staged.items()):
+            normalized = normalize(input_dir, filename, settings.PREPROCESS_MAX_SIDE)
+            if normalized:
+                staged[content_hash], dimensions[content_hash] = normalized
+        tiled = []
+        for filename in staged.values():
+            tiled_image = split(
+                input_dir, filename, settings.TILE_SIZE, settings.TILE_OVERLAP
+            )
+            if tiled_image:
+                tiled.append(tiled_image)
+        wanted = math.ceil(len(os.listdir(input_dir)) / settings.BATCH_SHARD_MIN_SIZE)
+        with pool.acquire(wanted) as engines:
+            shards = shard(input_dir, len(engines))
+            outputs = [f"{shard_dir}_output" for shard_dir in shards]
+            with ThreadPoolExecutor(len(shards)) as executor:
+                list(executor.map(RestorationEngine.restore, engines, shards, outputs))
+        merge(outputs, batch_dir)
+        final_output = os.path.join(batch_dir, "final_output")
+        for tiled_image in tiled:
+            target = os.path.join(final_output, restored_name(tiled_image.filename))
+            blend(tiled_image, final_output, target, settings.TILE_OVERLAP)
+        return route(routes, staged, batch_dir), dimensions
+
+
+async def finish(
+    db: AsyncSession,
+    cache: ResultCache,
+    job: Job,
+    content_hashes: list[str],
+    error: Exception | None,
+    dimensions: dict[str, dict[str, int]] | None = None,
+) -> None:
+    if error:
+        await set_status(db, job, JobStatusEnum.failed, error=str(error))
+        return
+
+    for content_hash in content_hashes:
+        await run_in_threadpool(publish, content_hash)
+        await run_in_threadpool(cache.put, content_hash)
+        if dimensions and content_hash in dimensions:
+            await set_dimensions(db, content_hash, dimensions[content_hash])
+
+    rendered = await asyncio.gather(
+        *(derivatives.create(content_hash) for content_hash in content_hashes),
+        return_exceptions=True,
+    )
+    for content_hash, locations in zip(content_hashes, rendered):
+        # Previews are optional, a failure here doesn't fail the restoration
+        if isinstance(locations, Exception):
+            logger.error("Derivatives of %s failed: %s", content_hash, locations)
+        elif locations:
+            await set_derivatives(db, content_hash, locations)
+    if results_storage().remote:
+        # Published, the local copies only served to render derivatives
+        for content_hash in content_hashes:
+            if os.path.exists(restored_path(content_hash)):
+                os.remove(restored_path(content_hash))
+    await set_status(db, job, JobStatusEnum.done)
+
+
+async def restore_jobs(
+    db: AsyncSession,
+    pool: EnginePool,
+    cache: ResultCache,
+    inputs: dict[Job, dict[str, str]],
+) -> None:
+    try:
+        incomplete, dimensions = await run_in_threadpool(restore_batch, pool, inputs)
+    except Exception as exc:
+        if len(inputs) == 1:
+            job = next(iter(inputs))
+            logger.exception("Job %s failed", job.id)
+            await finish(db, cache, job, [], exc)
+            return
+        # Isolate the failing input instead of failing the whole batch
+        logger.exception("Batch failed, retrying its jobs one by one")
+        for job, job_inputs in inputs.items():
+            await restore_jobs(db, pool, cache, {job: job_inputs})
+        return
+
+    for job, job_inputs in inputs.items():
+        error = missing_error if job in incomplete else None
+        await finish(db, cache, job, list(job_inputs), error, dimensions)
+
+
+async def keep_claimed(job_ids: list[UUID], interval: float) -> None:
+    """
+    Renews the lease on jobs being restored, so other workers only take
+    over jobs of a worker that died.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_manager.session() as db:
+                await renew_claims(db, job_ids)
+        except Exception:
+            logger.exception("Unable to renew claims on jobs %s", job_ids)
+
+
+async def process_batch(
+    pool: EnginePool, cache: ResultCache, max_size: int, max_wait: float
+) -> bool:
+    async with session_manager.session(expire_on_commit=False) as db:
+        inputs = await collect_batch(db, max_size, max_wait)
+        if not inputs:
+            return False
+        jobs = list(inputs)
+
+        logger.info("Processing batch of %s jobs", len(jobs))
+        heartbeat = asyncio.create_task(
+            keep_claimed([job.id for job in jobs], settings.JOB_LEASE_TIMEOUT / 3)
+        )
+        try:
+            await restore_jobs(db, pool, cache, inputs)
+        finally:
+            heartbeat.cancel()
+            for job in jobs:
+                clear_dir(job.input_dir)
+        return True
+
+
+async def evict_results(cache: ResultCache, interval: float) -> None:
+    """
+    Keeps results nothing references within the cache budget, apart from
+    restoration so batches don't wait for the LRU scan.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_manager.session() as db:
+                await cache.evict(partial(referenced_hashes, db))
+        except Exception:
+            logger.exception("Unable to evict results")
+
+
+async def sweep_uploads(db: AsyncSession) -> None:
+    """
+    Removes jobs and staged files of uploads that never completed.
+    """
+    for job in await expire_uploading(db, settings.UPLOAD_SESSION_TTL):
+        logger.info("Upload of job %s expired", job.id)
+        await run_in_threadpool(clear_dir, job.input_dir)
+    if not originals_storage().remote:
+        await run_in_threadpool(upload_sessions.expire_uploads)
+
+
+async def sweep(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_manager.session(expire_on_commit=False) as db:
+                await sweep_uploads(db)
+        except Exception:
+            logger.exception("Unable to sweep expired uploads")
+
+
+async def consume(pool: EnginePool, cache: ResultCache, poll_interval: float) -> None:
+    while True:
+        try:
+            processed = await process_batch(
+                pool, cache, settings.BATCH_MAX_SIZE, settings.BATCH_MAX_WAIT
+            )
+        except Exception:
+            logger.exception("Unable to fetch the next batch")
+            processed = False
+        if not processed:
+            await asyncio.sleep(poll_interval)
+
+
+async def main(concurrency: int | None, poll_interval: float) -> None:
+    session_manager.init(settings.DB_URL)
+    redis_client = RedisClient(settings.REDIS_HOST, settings.REDIS_PASSWORD)
+    cache = ResultCache(
+        redis_client.conn,
+        settings.RESULT_CACHE_MAX_BYTES,
+        settings.RESULT_CACHE_EVICT_GRACE,
+    )
+    # One engine per group of RESTORATION_THREADS cores unless set explicitly
+    concurrency = concurrency or max(
+        1, (os.cpu_count() or 1) // settings.RESTORATION_THREADS
+    )
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    engines = {
+        f"{prefix}-{i}": RestorationEngine(
+            settings.RESTORATION_WORKDIR,
+            settings.RESTORATION_WARMUP_MODULES,
+            settings.RESTORATION_STARTUP_TIMEOUT,
+            settings.RESTORATION_THREADS,
+        )
+        for i in range(concurrency)
+    }
+    pool = EnginePool(list(engines.values()))
+    try:
+        # Warm-up: interpreter start and imports happen here, before the
+        # first job is claimed. Models are loaded by run.py on every batch
+        await run_in_threadpool(pool.start)
+        await asyncio.gather(
+            monitor(engines, poll_interval),
+            evict_results(cache, settings.RESULT_CACHE_EVICT_INTERVAL),
+            sweep(settings.UPLOAD_SWEEP_INTERVAL),
+            *(consume(pool, cache, poll_interval) for _ in range(len(pool))),
+        )
+    finally:
+        pool.stop()
+        derivatives.shutdown()
+        await session_manager.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(settings.WORKER_CONCURRENCY, settings.WORKER_POLL_INTERVAL))
@@ -0,0 +1,28 @@
+import contextlib
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+
+
+@contextlib.contextmanager
+def workspace(root: str) -> Iterator[str]:
+    """
+    Creates a private folder under `root` and removes it on exit,
+    whether the work inside succeeded or not.
+    """
+    os.makedirs(root, exist_ok=True)
+    path = tempfile.mkdtemp(dir=root)
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def publish(path: str, target: str) -> None:
+    """
+    Hands a fully written folder over to its consumers in one step.
+    Consumers never see a partially populated `target`.
+    """
+    os.makedirs(path, exist_ok=True)
+    os.rename(path, target)
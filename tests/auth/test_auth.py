@@ -129,6 +129,19 @@ async def test_logout(client: AsyncClient, create_user, authorization_header):
     assert response.status_code == 204
 
 
+@pytest.mark.asyncio
+async def test_revoked_token(client: AsyncClient, create_user, authorization_header):
+    """
+    Trying to use access token after log out
+    """
+    response = await client.delete("/api/auth/logout", headers=authorization_header)
+    assert response.status_code == 204
+
+    response = await client.get("/api/users/me", headers=authorization_header)
+    assert response.status_code == 401
+    assert response.json().get("detail") == "Token has been revoked"
+
+
 @pytest.mark.asyncio
 async def test_get_current_user(client: AsyncClient, create_user, authorization_header):
     """
@@ -140,3 +153,16 @@ async def test_get_current_user(client: AsyncClient, create_user, authorization_
     response = await client.get("/api/users/me", headers=authorization_header)
     assert response.status_code == 200
     assert exact_schema(user)
+
+
+@pytest.mark.asyncio
+async def test_auth_hasher_overloaded(client: AsyncClient, create_user, monkeypatch):
+    """
+    Trying to authenticate while the password hashing queue is full
+    """
+    from src.security import password_hasher
+
+    monkeypatch.setattr(password_hasher, "pending", password_hasher.max_pending)
+    response = await client.post("/api/auth/login", data=user_data)
+    assert response.status_code == 503
+    assert response.headers.get("retry-after") == "1"
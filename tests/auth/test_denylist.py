@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+from src.cache import LocalTTLCache
+from src.denylist import DENYLIST_CHANNEL, is_revoked, listen, local_cache
+from src.redis import RedisClient
+
+
+def test_local_cache_expiry(monkeypatch):
+    """
+    Trying to read local cache entries after their TTL and over capacity
+    """
+    now = [100.0]
+    monkeypatch.setattr("src.cache.time.monotonic", lambda: now[0])
+    cache = LocalTTLCache(maxsize=2, ttl=5)
+    cache.set("a", True)
+    cache.set("b", False, ttl=1)
+    assert cache.get("a") is True
+    assert cache.get("b") is False
+
+    now[0] += 2
+    assert cache.get("b") is None
+    cache.set("c", True)
+    cache.set("d", True)
+    assert cache.get("a") is None
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_revocation_from_other_instance():
+    """
+    Trying to use a token revoked by another instance
+    """
+    conn = RedisClient().async_conn
+    assert not await is_revoked("jti-elsewhere")
+    await conn.setex("jti-elsewhere", 60, "true")
+    # Known-good answer is served locally until the broadcast arrives
+    assert not await is_revoked("jti-elsewhere")
+
+    listener = asyncio.create_task(listen())
+    try:
+        for _ in range(50):
+            if await conn.pubsub_numsub(DENYLIST_CHANNEL) != [(DENYLIST_CHANNEL, 0)]:
+                break
+            await asyncio.sleep(0.02)
+        await conn.publish(DENYLIST_CHANNEL, "jti-elsewhere 60")
+        for _ in range(50):
+            if local_cache.get("jti-elsewhere"):
+                break
+            await asyncio.sleep(0.02)
+        assert await is_revoked("jti-elsewhere")
+    finally:
+        listener.cancel()
+        await conn.delete("jti-elsewhere")
+        local_cache.delete("jti-elsewhere")
@@ -2,7 +2,7 @@ import asyncio
 from uuid import uuid4
 import pytest
 from contextlib import ExitStack
-from sqlalchemy import text
+from sqlalchemy import event, text
 import pytest_asyncio
 from src import init_app
 from src.db import get_db, session_manager
@@ -11,13 +11,22 @@ from httpx import AsyncClient
 from pytest_postgresql import factories
 from pytest_postgresql.janitor import DatabaseJanitor
 from src.enums import RoleEnum
+from src.config import settings
 
 
 user_data = {"username": "username", "password": "password"}
 
 
 @pytest.fixture(autouse=True)
-def app():
+def storage_paths(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "STATIC_PATH", str(tmp_path / "data"))
+    monkeypatch.setattr(settings, "INPUT_PATH", str(tmp_path / "input_images"))
+    monkeypatch.setattr(settings, "BATCH_ROOT", str(tmp_path / "batches"))
+    (tmp_path / "data").mkdir()
+
+
+@pytest.fixture(autouse=True)
+def app(storage_paths):
     with ExitStack():
         yield init_app(init_db=False)
 
@@ -96,3 +105,16 @@ async def authorize(client: AsyncClient) -> dict[str, str]:
 @pytest_asyncio.fixture
 async def authorization_header(authorize):
     return {"Authorization": f'Bearer {authorize["access_token"]}'}
+
+
+@pytest.fixture
+def count_queries(connection_test) -> list[str]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = session_manager._engine.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,21 @@
+file_data = {
+    "filename": str,
+    "file_size": int,
+    "file_location": str,
+    "content_hash": str,
+    "cached": bool,
+}
+job_created = {
+    "job_id": str,
+    "status": str,
+    "cache_hits": int,
+    "files_data": [file_data],
+    "user": str,
+}
+job = {
+    "id": str,
+    "status": str,
+    "error": None,
+    "created_at": str,
+    "updated_at": str,
+}
@@ -0,0 +1,152 @@
+import os
+import pytest
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from httpx import AsyncClient
+from pytest_schema import exact_schema
+from src.db import session_manager
+from src.enums import JobStatusEnum
+from src.services.image import get_by_job
+from src.services.job import claim_next, get_by_id, renew_claims
+from src.worker import sweep_uploads
+from .schemas import job, job_created
+
+
+image_files = [("files", ("photo.png", b"\x89PNG fake image content", "image/png"))]
+
+
+@pytest.mark.asyncio
+async def test_upload_enqueues_job(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to upload image and get the queued job back right away
+    """
+    response = await client.post(
+        "/api/users/upload_image", files=image_files, headers=authorization_header
+    )
+    assert response.status_code == 202
+    assert exact_schema(job_created) == response.json()
+    assert response.json().get("status") == "pending"
+
+    job_id = response.json().get("job_id")
+    response = await client.get(f"/api/jobs/{job_id}", headers=authorization_header)
+    assert response.status_code == 200
+    assert exact_schema(job) == response.json()
+    assert response.json().get("status") == "pending"
+
+
+@pytest.mark.asyncio
+async def test_worker_claims_job(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to claim queued job the way the worker does
+    """
+    response = await client.post(
+        "/api/users/upload_image", files=image_files, headers=authorization_header
+    )
+    job_id = response.json().get("job_id")
+
+    async with session_manager.session() as db:
+        claimed = await claim_next(db)
+        assert str(claimed.id) == job_id
+        assert await claim_next(db) is None
+
+    response = await client.get(f"/api/jobs/{job_id}", headers=authorization_header)
+    assert response.json().get("status") == "processing"
+
+
+@pytest.mark.asyncio
+async def test_expired_claim_taken_over(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to claim a job whose worker stopped renewing its claim
+    """
+    response = await client.post(
+        "/api/users/upload_image", files=image_files, headers=authorization_header
+    )
+    job_id = response.json().get("job_id")
+
+    async with session_manager.session() as db:
+        claimed = await claim_next(db)
+        await renew_claims(db, [claimed.id])
+        assert await claim_next(db) is None
+
+        claimed.claimed_at = datetime.now(timezone.utc) - timedelta(days=1)
+        await db.commit()
+        reclaimed = await claim_next(db)
+        assert str(reclaimed.id) == job_id
+        assert reclaimed.claimed_at > datetime.now(timezone.utc) - timedelta(hours=1)
+
+
+@pytest.mark.asyncio
+async def test_stale_uploading_job_swept(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to sweep jobs whose upload never completed
+    """
+    job_ids = []
+    for _ in range(2):
+        response = await client.post(
+            "/api/users/upload_image", files=image_files, headers=authorization_header
+        )
+        job_ids.append(response.json().get("job_id"))
+
+    async with session_manager.session(expire_on_commit=False) as db:
+        stale, recent = [await get_by_id(db, job_id) for job_id in job_ids]
+        for db_job in (stale, recent):
+            db_job.status = JobStatusEnum.uploading.value
+        stale.created_at = datetime.now(timezone.utc) - timedelta(days=1)
+        await db.commit()
+        assert os.path.isdir(stale.input_dir)
+
+        await sweep_uploads(db)
+        assert await get_by_id(db, stale.id) is None
+        assert not await get_by_job(db, stale.id)
+        assert not os.path.exists(stale.input_dir)
+        assert await get_by_id(db, recent.id)
+
+
+@pytest.mark.asyncio
+async def test_get_job_unauthorized(client: AsyncClient):
+    """
+    Trying to get job without auth
+    """
+    response = await client.get(f"/api/jobs/{uuid4()}")
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_get_not_existed_job(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to get not existed job
+    """
+    response = await client.get(f"/api/jobs/{uuid4()}", headers=authorization_header)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_another_user_job(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to get job of another user
+    """
+    response = await client.post(
+        "/api/users/upload_image", files=image_files, headers=authorization_header
+    )
+    job_id = response.json().get("job_id")
+
+    another_user = {"username": "another_user", "password": "12345678"}
+    await client.post("/api/users", json=another_user)
+    tokens = (await client.post("/api/auth/login", data=another_user)).json()
+    response = await client.get(
+        f"/api/jobs/{job_id}",
+        headers={"Authorization": f'Bearer {tokens["access_token"]}'},
+    )
+    assert response.status_code == 404
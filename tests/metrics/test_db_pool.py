@@ -0,0 +1,35 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from src.db import session_manager
+
+
+@pytest.mark.asyncio
+async def test_metrics_expose_pool_stats(client: AsyncClient, create_user):
+    """
+    Trying to read database pool checkout statistics
+    """
+    response = await client.get("/api/metrics")
+    assert response.status_code == 200
+    pool = response.json().get("db_pool")
+    assert set(pool) == {
+        "size",
+        "checked_out",
+        "overflow",
+        "checkouts",
+        "timeouts",
+        "wait_seconds_total",
+        "wait_seconds_max",
+    }
+    assert pool["checkouts"] > 0
+    assert pool["checked_out"] == 0
+
+
+@pytest.mark.asyncio
+async def test_statement_timeout():
+    """
+    Trying to read the statement timeout of pooled connections
+    """
+    async with session_manager.session() as session:
+        timeout = (await session.execute(text("SHOW statement_timeout"))).scalar()
+    assert timeout == "30s"
@@ -0,0 +1,65 @@
+import pytest
+from src.config import settings
+from src.redis import RedisClient
+from src.restoration import RestorationEngine, EnginePool
+from src.result_cache import ResultCache
+
+
+run_script = """
+import argparse
+import os
+import shutil
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--input_folder")
+parser.add_argument("--output_folder")
+parser.add_argument("--GPU")
+parser.add_argument("--with_scratch", action="store_true")
+opts = parser.parse_args()
+
+if not os.listdir(opts.input_folder):
+    raise SystemExit(1)
+
+final_output = os.path.join(opts.output_folder, "final_output")
+os.makedirs(final_output, exist_ok=True)
+for name in os.listdir(opts.input_folder):
+    stem = name[:-4]
+    shutil.copy(
+        os.path.join(opts.input_folder, name),
+        os.path.join(final_output, f"{stem}.png"),
+    )
+"""
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    workdir = tmp_path / "neural_link"
+    workdir.mkdir()
+    (workdir / "run.py").write_text(run_script)
+    return str(workdir)
+
+
+@pytest.fixture
+def engine(workdir):
+    engine = RestorationEngine(workdir, ["argparse"], startup_timeout=30, threads=1)
+    engine.start()
+    yield engine
+    engine.stop()
+
+
+@pytest.fixture
+def pool(workdir):
+    pool = EnginePool(
+        [RestorationEngine(workdir, ["argparse"], startup_timeout=30) for _ in range(2)]
+    )
+    pool.start()
+    yield pool
+    pool.stop()
+
+
+@pytest.fixture
+def cache():
+    cache = ResultCache(RedisClient().conn, settings.RESULT_CACHE_MAX_BYTES)
+    for key in cache.conn.scan_iter(match=f"{cache.namespace}:*"):
+        cache.conn.delete(key)
+    return cache
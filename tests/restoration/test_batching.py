@@ -0,0 +1,99 @@
+import os
+import pytest
+from httpx import AsyncClient
+from src.config import settings
+from src.worker import process_batch
+
+
+users_data = [
+    {"username": "first_user", "password": "password"},
+    {"username": "second_user", "password": "password"},
+]
+
+
+async def upload(
+    client: AsyncClient, user_data: dict[str, str], content: bytes | None = None
+) -> dict:
+    await client.post("/api/users", json=user_data)
+    tokens = (await client.post("/api/auth/login", data=user_data)).json()
+    headers = {"Authorization": f'Bearer {tokens["access_token"]}'}
+    content = content or user_data["username"].encode()
+    files = [("files", (f"{user_data['username']}.jpg", content, "image/jpeg"))]
+    response = await client.post(
+        "/api/users/upload_image", files=files, headers=headers
+    )
+    return {"headers": headers, **response.json()}
+
+
+@pytest.mark.asyncio
+async def test_batch_coalesces_users(client: AsyncClient, pool, cache):
+    """
+    Trying to restore uploads of different users in one batch
+    """
+    uploads = [await upload(client, user_data) for user_data in users_data]
+
+    assert await process_batch(pool, cache, max_size=16, max_wait=0.05)
+    assert not await process_batch(pool, cache, max_size=16, max_wait=0.05)
+
+    for uploaded in uploads:
+        response = await client.get(
+            f"/api/jobs/{uploaded['job_id']}", headers=uploaded["headers"]
+        )
+        assert response.json().get("status") == "done"
+        location = uploaded["files_data"][0]["file_location"]
+        assert os.path.exists(location.replace("/static", settings.STATIC_PATH))
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_max_size(client: AsyncClient, pool, cache):
+    """
+    Trying to restore more jobs than fit into one batch
+    """
+    uploads = [await upload(client, user_data) for user_data in users_data]
+
+    assert await process_batch(pool, cache, max_size=1, max_wait=0.05)
+    statuses = [
+        (
+            await client.get(
+                f"/api/jobs/{uploaded['job_id']}", headers=uploaded["headers"]
+            )
+        ).json()["status"]
+        for uploaded in uploads
+    ]
+    assert statuses == ["done", "pending"]
+
+
+@pytest.mark.asyncio
+async def test_same_content_restored_once(client: AsyncClient, pool, cache):
+    """
+    Trying to upload the same photo after it was already restored
+    """
+    first = await upload(client, users_data[0], b"same photo")
+    assert await process_batch(pool, cache, max_size=16, max_wait=0.05)
+
+    second = await upload(client, users_data[1], b"same photo")
+    assert second["status"] == "done"
+    assert second["cache_hits"] == 1
+    assert second["files_data"][0]["cached"] is True
+    assert second["files_data"][0]["content_hash"] == (
+        first["files_data"][0]["content_hash"]
+    )
+    assert second["files_data"][0]["file_location"] == (
+        first["files_data"][0]["file_location"]
+    )
+    assert not await process_batch(pool, cache, max_size=16, max_wait=0.05)
+
+
+@pytest.mark.asyncio
+async def test_same_content_in_one_batch(client: AsyncClient, pool, cache):
+    """
+    Trying to restore one photo uploaded by two users at the same time
+    """
+    uploads = [await upload(client, data, b"same photo") for data in users_data]
+
+    assert await process_batch(pool, cache, max_size=16, max_wait=0.05)
+    for uploaded in uploads:
+        response = await client.get(
+            f"/api/jobs/{uploaded['job_id']}", headers=uploaded["headers"]
+        )
+        assert response.json().get("status") == "done"
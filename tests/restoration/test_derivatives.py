@@ -0,0 +1,56 @@
+import io
+import os
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+from src.config import settings
+from src.worker import process_batch
+from .test_batching import upload, users_data
+from src.derivatives import render
+
+
+def test_render_fits_sizes(tmp_path):
+    """
+    Trying to render webp and jpeg derivatives of a restored image
+    """
+    Image.new("RGB", (400, 200)).save(tmp_path / "restored.png")
+    targets = {
+        "thumbnail": (str(tmp_path / "thumbnail" / "a.webp"), 100),
+        "large": (str(tmp_path / "large" / "a.webp"), 1000),
+    }
+
+    done = render(str(tmp_path / "restored.png"), targets, "webp", 80)
+    assert done == ["thumbnail", "large"]
+    with Image.open(targets["thumbnail"][0]) as thumbnail:
+        assert thumbnail.format == "WEBP"
+        assert thumbnail.size == (100, 50)
+    with Image.open(targets["large"][0]) as large:
+        assert large.size == (400, 200)
+
+    jpeg = {"small": (str(tmp_path / "small" / "a.jpg"), 200)}
+    assert render(str(tmp_path / "restored.png"), jpeg, "jpeg", 70) == ["small"]
+    assert render(str(tmp_path / "missing.png"), jpeg, "jpeg", 70) == []
+
+
+@pytest.mark.asyncio
+async def test_derivatives_recorded(client: AsyncClient, pool, cache):
+    """
+    Trying to restore a photo and read its derivatives back
+    """
+    content = io.BytesIO()
+    Image.new("RGB", (64, 48)).save(content, format="JPEG")
+    first = await upload(client, users_data[0], content.getvalue())
+    assert await process_batch(pool, cache, max_size=16, max_wait=0.05)
+
+    response = await client.get("/api/users/images/results", headers=first["headers"])
+    derivatives = response.json()[0]["derivatives"]
+    assert set(derivatives) == set(settings.DERIVATIVE_SIZES)
+    for location in derivatives.values():
+        assert location.endswith(".webp")
+        path = os.path.join(settings.STATIC_PATH, location.removeprefix("/static/"))
+        assert os.path.exists(path)
+
+    # Restored before: derivatives come with the upload
+    second = await upload(client, users_data[1], content.getvalue())
+    response = await client.get("/api/users/images/results", headers=second["headers"])
+    assert response.json()[0]["derivatives"] == derivatives
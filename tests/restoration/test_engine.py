@@ -0,0 +1,90 @@
+import os
+import pytest
+from src.config import settings
+from src.models import Job
+from src.restoration import RestorationEngine
+from src.worker import restore_batch
+
+
+def test_engine_restores_folder(engine, tmp_path):
+    """
+    Trying to restore a folder through the long-lived engine twice
+    """
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "photo.jpg").write_bytes(b"image")
+    output_dir = tmp_path / "output"
+
+    pid = engine._process.pid
+    engine.restore(str(input_dir), str(output_dir))
+    engine.restore(str(input_dir), str(output_dir))
+
+    assert os.listdir(output_dir / "final_output") == ["photo.png"]
+    assert engine._process.pid == pid
+    assert engine.ping()
+
+
+def test_engine_reports_failure(engine, tmp_path):
+    """
+    Trying to restore an empty folder
+    """
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+
+    with pytest.raises(RuntimeError):
+        engine.restore(str(input_dir), str(tmp_path / "output"))
+    assert engine.ping()
+
+
+def test_engine_restarts_after_crash(engine, tmp_path):
+    """
+    Trying to use the engine after its process was killed
+    """
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "photo.jpg").write_bytes(b"image")
+
+    engine._process.kill()
+    engine._process.join()
+    assert not engine.ping()
+
+    engine.restore(str(input_dir), str(tmp_path / "output"))
+    assert engine.ping()
+
+
+def test_pool_lends_idle_engines(pool):
+    """
+    Trying to borrow more engines than are idle
+    """
+    with pool.acquire(3) as engines:
+        assert len(engines) == 2
+    with pool.acquire(1) as first:
+        with pool.acquire(2) as second:
+            assert len(first) == len(second) == 1
+            assert first != second
+
+
+def test_batch_sharded_across_engines(pool, tmp_path, monkeypatch):
+    """
+    Trying to restore a batch big enough for several engines
+    """
+    monkeypatch.setattr(settings, "BATCH_SHARD_MIN_SIZE", 2)
+    job_dir = tmp_path / "job"
+    job_dir.mkdir()
+    inputs = {}
+    for i in range(4):
+        (job_dir / f"{i}.jpg").write_bytes(b"image")
+        inputs[str(i)] = f"{i}.jpg"
+    job = Job(input_dir=str(job_dir), output_dir=str(tmp_path / "restored"))
+
+    restored = []
+    original_restore = RestorationEngine.restore
+
+    def restore(engine, input_dir, output_dir):
+        restored.append(sorted(os.listdir(input_dir)))
+        original_restore(engine, input_dir, output_dir)
+
+    monkeypatch.setattr(RestorationEngine, "restore", restore)
+    assert restore_batch(pool, {job: inputs})[0] == set()
+    assert sorted(restored) == [["0.jpg", "2.jpg"], ["1.jpg", "3.jpg"]]
+    assert sorted(os.listdir(tmp_path / "restored")) == [f"{i}.png" for i in range(4)]
@@ -0,0 +1,37 @@
+import time
+import pytest
+from httpx import AsyncClient
+from src.redis import RedisClient
+from src.restoration import HEALTH_KEY
+from src.worker import report_health
+
+
+@pytest.mark.asyncio
+async def test_health_reports_engines(client: AsyncClient):
+    """
+    Trying to read engines health reported by workers
+    """
+    conn = RedisClient().conn
+    conn.hset(HEALTH_KEY, "worker-0", f"ok:{time.time()}")
+    conn.hset(HEALTH_KEY, "worker-1", f"ok:{time.time() - 3600}")
+    response = await client.get("/api/health")
+    assert response.status_code == 200
+    assert response.json().get("restoration_ready") is True
+    assert response.json().get("engines") == {"worker-0": "ok"}
+    assert not conn.hexists(HEALTH_KEY, "worker-1")
+    conn.delete(HEALTH_KEY)
+
+
+@pytest.mark.asyncio
+async def test_worker_reports_health():
+    """
+    Trying to report health of a busy engine without pinging it
+    """
+
+    class BusyEngine:
+        busy = True
+
+    await report_health("worker-0", BusyEngine())
+    conn = RedisClient().conn
+    assert conn.hget(HEALTH_KEY, "worker-0").startswith("ok:")
+    conn.delete(HEALTH_KEY)
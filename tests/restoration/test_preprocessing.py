@@ -0,0 +1,85 @@
+import io
+import os
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+from src.worker import process_batch
+from .test_batching import upload, users_data
+from src.preprocessing import normalize
+
+
+def test_normalize_downsizes_to_png(tmp_path):
+    """
+    Trying to normalize a large jpeg photo
+    """
+    Image.new("RGB", (400, 200), (120, 80, 40)).save(tmp_path / "photo.jpeg")
+
+    canonical, dimensions = normalize(str(tmp_path), "photo.jpeg", 100)
+    assert canonical == "photo.png"
+    assert "photo.jpeg" not in os.listdir(tmp_path)
+    assert dimensions == {
+        "original_width": 400,
+        "original_height": 200,
+        "processed_width": 100,
+        "processed_height": 50,
+    }
+    with Image.open(tmp_path / canonical) as normalized:
+        assert normalized.format == "PNG"
+        assert normalized.mode == "RGB"
+
+
+def test_normalize_applies_orientation(tmp_path):
+    """
+    Trying to normalize a photo rotated by its EXIF orientation tag
+    """
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new("RGB", (40, 20)).save(tmp_path / "photo.jpg", exif=exif)
+
+    _, dimensions = normalize(str(tmp_path), "photo.jpg", 100)
+    assert (dimensions["processed_width"], dimensions["processed_height"]) == (20, 40)
+
+
+def test_normalize_flattens_transparency(tmp_path):
+    """
+    Trying to normalize a transparent png
+    """
+    Image.new("RGBA", (10, 10), (0, 0, 0, 0)).save(tmp_path / "photo.png")
+
+    normalize(str(tmp_path), "photo.png", 100)
+    with Image.open(tmp_path / "photo.png") as normalized:
+        assert normalized.mode == "RGB"
+        assert normalized.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_normalize_skips_unknown_content(tmp_path):
+    """
+    Trying to normalize a file that is not an image
+    """
+    (tmp_path / "photo.jpg").write_bytes(b"image")
+    assert normalize(str(tmp_path), "photo.jpg", 100) is None
+
+
+@pytest.mark.asyncio
+async def test_dimensions_recorded(client: AsyncClient, pool, cache):
+    """
+    Trying to restore a photo and read its dimensions back
+    """
+    content = io.BytesIO()
+    Image.new("RGB", (64, 48)).save(content, format="JPEG")
+    uploaded = await upload(client, users_data[0], content.getvalue())
+    assert await process_batch(pool, cache, max_size=16, max_wait=0.05)
+
+    response = await client.get(
+        "/api/users/images/results", headers=uploaded["headers"]
+    )
+    image = response.json()[0]
+    assert (image["original_width"], image["original_height"]) == (64, 48)
+    assert (image["processed_width"], image["processed_height"]) == (64, 48)
+
+    cached = await upload(client, users_data[1], content.getvalue())
+    assert cached["cache_hits"] == 1
+    response = await client.get("/api/users/images/results", headers=cached["headers"])
+    image = response.json()[0]
+    assert (image["original_width"], image["original_height"]) == (64, 48)
+    assert (image["processed_width"], image["processed_height"]) == (64, 48)
@@ -0,0 +1,114 @@
+import os
+import pytest
+from uuid import uuid4
+from httpx import AsyncClient
+from src.storage import restored_dir, restored_path
+from src.result_cache import ResultCache
+
+
+def restore(content_hash: str, size: int) -> None:
+    os.makedirs(restored_dir(), exist_ok=True)
+    with open(restored_path(content_hash), "wb") as restored:
+        restored.write(b"0" * size)
+
+
+def test_cache_counts_hits_and_misses(cache: ResultCache):
+    """
+    Trying to look up restored and not restored images
+    """
+    content_hash = uuid4().hex
+    before = cache.stats()
+
+    assert cache.get(content_hash) is None
+    restore(content_hash, 10)
+    cache.put(content_hash)
+    assert cache.get(content_hash).endswith(f"{content_hash}.png")
+
+    after = cache.stats()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+
+
+async def nothing_referenced(content_hashes: list[str]) -> set[str]:
+    return set()
+
+
+def fill(cache: ResultCache) -> tuple[str, str, str]:
+    cache.max_bytes = 25
+    first, second, third = (uuid4().hex for _ in range(3))
+    for content_hash in (first, second):
+        restore(content_hash, 10)
+        cache.put(content_hash)
+    cache.get(first)
+    restore(third, 10)
+    cache.put(third)
+    return first, second, third
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used(cache: ResultCache):
+    """
+    Trying to store more restored images than the cache allows
+    """
+    cache.grace = 0
+    first, second, third = fill(cache)
+
+    await cache.evict(nothing_referenced)
+    assert not os.path.exists(restored_path(second))
+    assert cache.get(second) is None
+    assert cache.get(first) and cache.get(third)
+
+
+@pytest.mark.asyncio
+async def test_cache_keeps_referenced_results(cache: ResultCache):
+    """
+    Trying to evict results images still point to or were just used
+    """
+    first, second, third = fill(cache)
+    await cache.evict(nothing_referenced)
+    assert all(cache.get(content_hash) for content_hash in (first, second, third))
+
+    cache.grace = 0
+
+    async def referenced(content_hashes: list[str]) -> set[str]:
+        return {second} & set(content_hashes)
+
+    await cache.evict(referenced)
+    assert os.path.exists(restored_path(second))
+    assert not os.path.exists(restored_path(first))
+    assert cache.get(third)
+
+
+@pytest.mark.asyncio
+async def test_cache_eviction_resumes(cache: ResultCache):
+    """
+    Trying to evict in bounded runs past results images still point to
+    """
+    cache.grace = 0
+    first, second, third = fill(cache)
+
+    async def referenced(content_hashes: list[str]) -> set[str]:
+        return {first, second} & set(content_hashes)
+
+    # Least recently used first: second, first, third
+    for _ in range(2):
+        await cache.evict(referenced, batch=1, pages=1)
+        assert all(os.path.exists(restored_path(h)) for h in (first, second, third))
+    await cache.evict(referenced, batch=1, pages=1)
+    assert not os.path.exists(restored_path(third))
+    assert cache.get(first) and cache.get(second)
+
+
+@pytest.mark.asyncio
+async def test_metrics_expose_cache_stats(client: AsyncClient):
+    """
+    Trying to read result cache counters
+    """
+    response = await client.get("/api/metrics")
+    assert response.status_code == 200
+    assert set(response.json().get("result_cache")) == {
+        "hits",
+        "misses",
+        "entries",
+        "bytes",
+    }
@@ -0,0 +1,285 @@
+import base64
+import io
+import os
+from hashlib import sha256
+import pytest
+from botocore.response import StreamingBody
+from botocore.exceptions import ClientError
+from botocore.stub import ANY, Stubber
+from httpx import AsyncClient
+from PIL import Image
+from src.config import settings
+from src.storage import (
+    BACKENDS,
+    LocalStorage,
+    S3Storage,
+    options_key,
+    original_key,
+    original_path,
+    restored_key,
+    restored_path,
+    upload_key,
+)
+from src.worker import process_batch
+from .test_batching import upload, users_data
+
+
+class StandInStorage(LocalStorage):
+    """
+    Remote store kept in a folder nothing else reads from.
+    """
+
+    remote = True
+
+    def url(self, key: str) -> str:
+        return f"https://bucket.test/{key}?signature=test"
+
+    def upload_url(
+        self, key: str, size: int, content_hash: str
+    ) -> tuple[str, dict[str, str]]:
+        return self.url(key), {"x-amz-checksum-sha256": content_hash}
+
+
+@pytest.fixture
+def remote(monkeypatch, tmp_path):
+    storage = StandInStorage(str(tmp_path / "bucket"))
+    monkeypatch.setitem(BACKENDS, "standin", lambda: storage)
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "standin")
+    return storage
+
+
+def test_local_storage(tmp_path):
+    """
+    Trying to store, read back, move and delete a file
+    """
+    storage = LocalStorage(str(tmp_path / "store"), "/files")
+    (tmp_path / "a.txt").write_text("content")
+
+    storage.put_file("dir/a.txt", str(tmp_path / "a.txt"))
+    assert storage.exists("dir/a.txt")
+    assert storage.size("dir/a.txt") == len("content")
+    assert storage.url("dir/a.txt") == "/files/dir/a.txt"
+    with pytest.raises(ValueError):
+        storage.upload_url("dir/a.txt", 7, "0" * 64)
+
+    storage.get_file("dir/a.txt", str(tmp_path / "copy" / "a.txt"))
+    assert (tmp_path / "copy" / "a.txt").read_text() == "content"
+
+    storage.move("dir/a.txt", "other/a.txt")
+    assert not storage.exists("dir/a.txt")
+    storage.delete("other/a.txt")
+    assert not storage.exists("other/a.txt")
+    storage.delete("other/a.txt")
+
+
+@pytest.mark.parametrize(
+    "option",
+    ["RESTORATION_MODEL_VERSION", "PREPROCESS_MAX_SIDE", "TILE_SIZE", "TILE_OVERLAP"],
+)
+def test_options_key(monkeypatch, option: str):
+    """
+    Trying to keep results of different restoration options apart
+    """
+    key = options_key()
+    monkeypatch.setattr(settings, option, getattr(settings, option) * 2)
+    assert options_key() != key
+    assert restored_key("hash") == f"restored/{options_key()}/hash.png"
+
+
+@pytest.fixture
+def bucket() -> S3Storage:
+    return S3Storage(
+        "bucket", region="us-east-1", access_key_id="test", secret_access_key="test"
+    )
+
+
+def test_s3_storage(bucket: S3Storage, tmp_path):
+    """
+    Trying to store, read back, move and delete a file in a bucket
+    """
+    stubber = Stubber(bucket.client)
+    key, content = "dir/a.jpg", b"content"
+    (tmp_path / "a.jpg").write_bytes(content)
+    params = {"Bucket": "bucket", "Key": key}
+
+    stubber.add_response(
+        "put_object", {}, {**params, "Body": ANY, "ContentType": "image/jpeg"}
+    )
+    stubber.add_response("head_object", {"ContentLength": len(content)}, params)
+    stubber.add_response("head_object", {"ContentLength": len(content)}, params)
+    stubber.add_response(
+        "get_object",
+        {"Body": StreamingBody(io.BytesIO(content), len(content))},
+        params,
+    )
+    moved = {"Bucket": "bucket", "Key": "dir/b.jpg"}
+    stubber.add_response("head_object", {"ContentLength": len(content)}, params)
+    stubber.add_response("copy_object", {}, {**moved, "CopySource": params})
+    stubber.add_response("delete_object", {}, params)
+    stubber.add_response("delete_object", {}, moved)
+    stubber.add_client_error("head_object", "404", http_status_code=404)
+    stubber.add_client_error("head_object", "403", http_status_code=403)
+    with stubber:
+        bucket.put_file(key, str(tmp_path / "a.jpg"))
+        assert bucket.exists(key)
+        bucket.get_file(key, str(tmp_path / "copy" / "a.jpg"))
+        bucket.move(key, "dir/b.jpg")
+        bucket.delete("dir/b.jpg")
+        assert not bucket.exists("dir/b.jpg")
+        # Errors other than a missing key are not taken for one
+        with pytest.raises(ClientError):
+            bucket.exists(key)
+    stubber.assert_no_pending_responses()
+    assert (tmp_path / "copy" / "a.jpg").read_bytes() == content
+    assert not (tmp_path / "copy" / "a.jpg.partial").exists()
+
+
+def test_s3_presigned_urls(bucket: S3Storage):
+    """
+    Trying to hand out download and upload URLs of a bucket
+    """
+    content_hash = sha256(b"content").hexdigest()
+    checksum = base64.b64encode(sha256(b"content").digest()).decode()
+
+    assert "/dir/a.jpg?" in bucket.url("dir/a.jpg")
+    url, headers = bucket.upload_url("dir/a.jpg", 7, content_hash)
+    assert "/dir/a.jpg?" in url
+    assert headers == {"Content-Type": "image/jpeg", "x-amz-checksum-sha256": checksum}
+
+
+@pytest.mark.asyncio
+async def test_results_published_to_remote(
+    client: AsyncClient, pool, cache, remote: StandInStorage
+):
+    """
+    Trying to restore an image with a remote storage and download it
+    """
+    uploaded = await upload(client, users_data[0], b"content")
+    content_hash = uploaded["files_data"][0]["content_hash"]
+    assert remote.exists(original_key(content_hash, "jpg"))
+
+    assert await process_batch(pool, cache, max_size=16, max_wait=0.05)
+    assert remote.exists(restored_key(content_hash))
+    assert not os.path.exists(restored_path(content_hash))
+
+    location = uploaded["files_data"][0]["file_location"]
+    response = await client.get(location)
+    assert response.status_code == 307
+    assert response.headers["location"] == remote.url(restored_key(content_hash))
+
+    # Known to the cache through the remote store
+    second = await upload(client, users_data[1], b"content")
+    assert second["cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_inputs_fetched_from_remote(
+    client: AsyncClient, pool, cache, remote: StandInStorage
+):
+    """
+    Trying to restore an upload received by another node
+    """
+    uploaded = await upload(client, users_data[0])
+    content_hash = uploaded["files_data"][0]["content_hash"]
+    # Nothing of the upload is left on the node that received it
+    assert not os.path.exists(original_path(content_hash, "jpg"))
+    assert not os.path.exists(os.path.join(settings.INPUT_PATH, uploaded["job_id"]))
+
+    assert await process_batch(pool, cache, max_size=16, max_wait=0.05)
+    response = await client.get(
+        f"/api/jobs/{uploaded['job_id']}", headers=uploaded["headers"]
+    )
+    assert response.json().get("status") == "done"
+    assert remote.exists(restored_key(content_hash))
+
+
+@pytest.mark.asyncio
+async def test_restored_inputs_not_staged(
+    client: AsyncClient, pool, cache, remote: StandInStorage
+):
+    """
+    Trying to restore a job whose only input another job restored meanwhile
+    """
+    content = io.BytesIO()
+    Image.new("RGB", (64, 48)).save(content, format="JPEG")
+    first = await upload(client, users_data[0], content.getvalue())
+    second = await upload(client, users_data[1], content.getvalue())
+    assert second["cache_hits"] == 0
+
+    assert await process_batch(pool, cache, max_size=1, max_wait=0.05)
+    await process_batch(pool, cache, max_size=1, max_wait=0.05)
+    for uploaded in (first, second):
+        response = await client.get(
+            f"/api/jobs/{uploaded['job_id']}", headers=uploaded["headers"]
+        )
+        assert response.json().get("status") == "done"
+    response = await client.get("/api/users/images/results", headers=second["headers"])
+    image = response.json()[0]
+    assert (image["original_width"], image["original_height"]) == (64, 48)
+
+
+@pytest.mark.asyncio
+async def test_failed_download_cleaned_up(
+    client: AsyncClient, pool, cache, remote: StandInStorage, monkeypatch
+):
+    """
+    Trying to restore a job whose inputs can't be downloaded
+    """
+    uploaded = await upload(client, users_data[0])
+
+    def get_file(key: str, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(b"partial")
+        raise OSError("connection reset")
+
+    monkeypatch.setattr(remote, "get_file", get_file)
+    await process_batch(pool, cache, max_size=16, max_wait=0.05)
+    response = await client.get(
+        f"/api/jobs/{uploaded['job_id']}", headers=uploaded["headers"]
+    )
+    assert response.json().get("status") == "failed"
+    assert not os.path.exists(os.path.join(settings.INPUT_PATH, uploaded["job_id"]))
+
+
+@pytest.mark.asyncio
+async def test_direct_upload_to_remote(
+    client: AsyncClient, pool, cache, remote: StandInStorage, tmp_path
+):
+    """
+    Trying to upload an image straight to a remote storage and restore it
+    """
+    uploaded = await upload(client, users_data[0])
+    headers = uploaded["headers"]
+    content = b"direct upload"
+    declared = {
+        "filename": "photo.jpg",
+        "size": len(content),
+        "content_hash": sha256(content).hexdigest(),
+    }
+    response = await client.post(
+        "/api/uploads", json={"files": [declared]}, headers=headers
+    )
+    session_id = response.json()["id"]
+    slot = response.json()["slots"][0]
+    key = upload_key(session_id, 0, "jpg")
+    assert slot["url"] == remote.url(key)
+
+    response = await client.post(f"/api/uploads/{session_id}/complete", headers=headers)
+    assert response.status_code == 409
+
+    # The client puts the file to the presigned URL
+    (tmp_path / "photo.jpg").write_bytes(content)
+    remote.put_file(key, str(tmp_path / "photo.jpg"))
+    response = await client.post(f"/api/uploads/{session_id}/complete", headers=headers)
+    assert response.status_code == 202
+    assert response.json()["files_data"][0]["file_size"] == len(content)
+    assert remote.exists(original_key(declared["content_hash"], "jpg"))
+    assert not remote.exists(key)
+    job_id = response.json()["job_id"]
+    assert not os.path.exists(os.path.join(settings.INPUT_PATH, job_id))
+
+    assert await process_batch(pool, cache, max_size=16, max_wait=0.05)
+    response = await client.get(f"/api/jobs/{job_id}", headers=headers)
+    assert response.json().get("status") == "done"
+    assert remote.exists(restored_key(declared["content_hash"]))
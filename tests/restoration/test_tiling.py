@@ -0,0 +1,107 @@
+import os
+import shutil
+import pytest
+from PIL import Image
+from pydantic import ValidationError
+from src.config import Settings, settings
+from src.models import Job
+from src.worker import restore_batch
+from src.tiling import split, blend
+
+
+def scan(path: str, size: tuple[int, int]) -> None:
+    image = Image.linear_gradient("L").resize(size).convert("RGB")
+    image.save(path)
+
+
+def test_small_image_not_tiled(tmp_path):
+    """
+    Trying to split an image smaller than a tile
+    """
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    scan(str(input_dir / "photo.png"), (100, 80))
+    assert split(str(input_dir), "photo.png", 128, 16) is None
+    assert os.listdir(input_dir) == ["photo.png"]
+
+
+def test_tiles_blend_back(tmp_path):
+    """
+    Trying to split a large scan and blend unchanged tiles back
+    """
+    input_dir, restored_dir = tmp_path / "input", tmp_path / "restored"
+    input_dir.mkdir()
+    restored_dir.mkdir()
+    scan(str(input_dir / "scan.png"), (300, 200))
+    original = Image.open(input_dir / "scan.png").convert("RGB")
+
+    tiled = split(str(input_dir), "scan.png", 128, 16)
+    assert len(tiled.tiles) == 6
+    assert "scan.png" not in os.listdir(input_dir)
+    for tile in tiled.tiles:
+        with Image.open(input_dir / tile.name) as tile_image:
+            assert max(tile_image.size) <= 128
+        shutil.copy(input_dir / tile.name, restored_dir / tile.name)
+
+    assert blend(tiled, str(restored_dir), str(tmp_path / "scan.png"), 16)
+    with Image.open(tmp_path / "scan.png") as blended:
+        assert blended.size == original.size
+        assert blended.tobytes() == original.tobytes()
+
+
+def test_blend_follows_restoration_scale(tmp_path):
+    """
+    Trying to blend tiles the restoration step upscaled twice
+    """
+    input_dir, restored_dir = tmp_path / "input", tmp_path / "restored"
+    input_dir.mkdir()
+    restored_dir.mkdir()
+    scan(str(input_dir / "scan.png"), (300, 200))
+
+    tiled = split(str(input_dir), "scan.png", 128, 16)
+    for tile in tiled.tiles:
+        with Image.open(input_dir / tile.name) as tile_image:
+            tile_image.resize((tile_image.width * 2, tile_image.height * 2)).save(
+                restored_dir / tile.name
+            )
+
+    assert blend(tiled, str(restored_dir), str(tmp_path / "scan.png"), 16)
+    with Image.open(tmp_path / "scan.png") as blended:
+        assert blended.size == (600, 400)
+
+
+def test_blend_missing_tile(tmp_path):
+    """
+    Trying to blend when restoration lost a tile
+    """
+    scan(str(tmp_path / "scan.png"), (300, 200))
+    tiled = split(str(tmp_path), "scan.png", 128, 16)
+    assert not blend(tiled, str(tmp_path / "restored"), str(tmp_path / "out.png"), 16)
+
+
+def test_batch_with_large_scan(pool, tmp_path, monkeypatch):
+    """
+    Trying to restore a scan larger than a tile through the engines
+    """
+    monkeypatch.setattr(settings, "TILE_SIZE", 128)
+    monkeypatch.setattr(settings, "TILE_OVERLAP", 16)
+    monkeypatch.setattr(settings, "BATCH_SHARD_MIN_SIZE", 2)
+    job_dir = tmp_path / "job"
+    job_dir.mkdir()
+    scan(str(job_dir / "scan.png"), (300, 200))
+    job = Job(input_dir=str(job_dir), output_dir=str(tmp_path / "restored"))
+
+    incomplete, dimensions = restore_batch(pool, {job: {"scan": "scan.png"}})
+    assert incomplete == set()
+    assert dimensions["scan"]["processed_width"] == 300
+    with Image.open(tmp_path / "restored" / "scan.png") as restored:
+        assert restored.size == (300, 200)
+
+
+def test_overlap_validated():
+    """
+    Trying to configure tiles that overlap by their whole size
+    """
+    with pytest.raises(ValidationError):
+        Settings(TILE_SIZE=64, TILE_OVERLAP=64)
+    assert Settings(TILE_SIZE=64, TILE_OVERLAP=16).TILE_OVERLAP == 16
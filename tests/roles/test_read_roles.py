@@ -0,0 +1,25 @@
+import pytest
+from pytest_schema import exact_schema
+from httpx import AsyncClient
+from .schemas import roles
+
+
+@pytest.mark.asyncio
+async def test_read_roles_pages(client: AsyncClient, create_user, authorization_header):
+    """
+    Trying to read all roles page by page
+    """
+    response = await client.get(
+        "/api/roles", params={"limit": 1}, headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert exact_schema(roles) == response.json()
+    first = response.json()[0]["name"]
+    after = response.headers.get("x-next-cursor")
+    assert after
+
+    response = await client.get(
+        "/api/roles", params={"limit": 1, "after": after}, headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["name"] > first
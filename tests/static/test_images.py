@@ -0,0 +1,133 @@
+import os
+import pytest
+from httpx import AsyncClient
+from src.config import settings
+from src.static import ImageFiles
+
+
+content = bytes(range(256)) * 4
+url = "/static/restored/key/abc.png"
+
+
+@pytest.fixture
+def restored_file():
+    path = os.path.join(settings.STATIC_PATH, "restored", "key", "abc.png")
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as file:
+        file.write(content)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_restored_image_cached(client: AsyncClient, restored_file):
+    """
+    Trying to get a restored image and revalidate it
+    """
+    response = await client.get(url)
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+
+    response = await client.get(url, headers={"if-none-match": etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_mutable_file_revalidated(client: AsyncClient):
+    """
+    Trying to get a file outside of the restored images
+    """
+    with open(os.path.join(settings.STATIC_PATH, "notes.txt"), "w") as file:
+        file.write("notes")
+    response = await client.get("/static/notes.txt")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+
+
+@pytest.mark.asyncio
+async def test_restored_image_ranges(client: AsyncClient, restored_file):
+    """
+    Trying to get parts of a restored image
+    """
+    response = await client.get(url, headers={"range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == content[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(content)}"
+
+    response = await client.get(url, headers={"range": "bytes=-5"})
+    assert response.status_code == 206
+    assert response.content == content[-5:]
+
+    response = await client.get(url, headers={"range": f"bytes={len(content)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+    # A range of an outdated copy is answered with the whole file
+    response = await client.get(
+        url, headers={"range": "bytes=0-9", "if-range": '"outdated"'}
+    )
+    assert response.status_code == 200
+    assert response.content == content
+
+
+@pytest.mark.asyncio
+async def test_precompressed_variant(client: AsyncClient, restored_file):
+    """
+    Trying to get a restored image that has a brotli variant
+    """
+    with open(f"{restored_file}.br", "wb") as file:
+        file.write(b"compressed")
+
+    response = await client.get(url, headers={"accept-encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["content-length"] == str(len(b"compressed"))
+    br_etag = response.headers["etag"]
+
+    response = await client.get(url, headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == content
+    assert response.headers["etag"] != br_etag
+
+
+@pytest.mark.asyncio
+async def test_accel_redirect(client: AsyncClient, restored_file, monkeypatch):
+    """
+    Trying to get a restored image with the transfer offloaded to nginx
+    """
+    monkeypatch.setattr(settings, "STATIC_ACCEL_REDIRECT_PREFIX", "/protected/")
+    response = await client.get(url)
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["x-accel-redirect"] == "/protected/restored/key/abc.png"
+    assert "immutable" in response.headers["cache-control"]
+
+
+@pytest.mark.asyncio
+async def test_zero_copy_send(restored_file):
+    """
+    Trying to get a restored image from a server with zero-copy send
+    """
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopysend":
+            message = {**message, "body": os.pread(message["file"], 1024, 0)}
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/restored/key/abc.png",
+        "headers": [(b"range", b"bytes=4-7")],
+        "extensions": {"http.response.zerocopysend": {}},
+    }
+    await ImageFiles(directory=settings.STATIC_PATH)(scope, receive, send)
+    assert messages[0]["status"] == 206
+    assert messages[1]["offset"] == 4 and messages[1]["count"] == 4
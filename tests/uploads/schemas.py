@@ -0,0 +1,12 @@
+slot = {
+    "index": int,
+    "filename": str,
+    "url": str,
+    "method": str,
+    "headers": dict,
+}
+upload_session = {
+    "id": str,
+    "expires_at": str,
+    "slots": [slot],
+}
@@ -0,0 +1,141 @@
+import os
+import pytest
+from hashlib import sha256
+from fastapi import HTTPException
+from httpx import AsyncClient
+from pytest_schema import exact_schema
+from starlette.requests import ClientDisconnect
+from src.uploads import append_stream
+from ..jobs.schemas import job_created
+
+
+content = bytes(range(256)) * 64
+declared = {
+    "filename": "scan.tiff",
+    "size": len(content),
+    "content_hash": sha256(content).hexdigest(),
+}
+
+
+async def initiate(client: AsyncClient, headers: dict[str, str]) -> str:
+    response = await client.post(
+        "/api/uploads/resumable", json=declared, headers=headers
+    )
+    assert response.status_code == 201
+    assert response.json()["offset"] == 0
+    return f"/api/uploads/resumable/{response.json()['id']}"
+
+
+async def send(
+    client: AsyncClient, url: str, headers: dict[str, str], offset: int, chunk: bytes
+):
+    return await client.patch(
+        url, content=chunk, headers={**headers, "Upload-Offset": str(offset)}
+    )
+
+
+@pytest.mark.asyncio
+async def test_resumable_upload(client: AsyncClient, create_user, authorization_header):
+    """
+    Trying to upload a file in chunks, resuming from the reported offset
+    """
+    url = await initiate(client, authorization_header)
+    half = len(content) // 2
+
+    response = await send(client, url, authorization_header, 0, content[:half])
+    assert response.status_code == 204
+    assert response.headers["upload-offset"] == str(half)
+
+    response = await client.head(
+        url, headers={**authorization_header, "Origin": "http://localhost:3000"}
+    )
+    assert response.status_code == 200
+    assert response.headers["upload-offset"] == str(half)
+    assert response.headers["upload-length"] == str(len(content))
+    exposed = response.headers["access-control-expose-headers"].lower()
+    assert "upload-offset" in exposed and "upload-length" in exposed
+
+    # A chunk sent again after a lost response is refused
+    response = await send(client, url, authorization_header, 0, content[:half])
+    assert response.status_code == 409
+    assert response.headers["upload-offset"] == str(half)
+
+    response = await send(client, url, authorization_header, half, content[half:])
+    assert response.status_code == 204
+
+    response = await client.post(f"{url}/finalize", headers=authorization_header)
+    assert response.status_code == 202
+    assert exact_schema(job_created) == response.json()
+    assert response.json()["status"] == "pending"
+    assert response.json()["files_data"][0]["file_size"] == len(content)
+
+    response = await client.head(url, headers=authorization_header)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_resumable_upload_incomplete(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to finalize an upload missing chunks or send more than declared
+    """
+    url = await initiate(client, authorization_header)
+    await send(client, url, authorization_header, 0, content[:100])
+
+    response = await client.post(f"{url}/finalize", headers=authorization_header)
+    assert response.status_code == 409
+    assert response.headers["upload-offset"] == "100"
+
+    response = await send(client, url, authorization_header, 100, content)
+    assert response.status_code == 413
+    response = await client.head(url, headers=authorization_header)
+    assert response.headers["upload-offset"] == "100"
+
+
+@pytest.mark.asyncio
+async def test_resumable_upload_wrong_content(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to finalize an upload whose content doesn't match its hash
+    """
+    url = await initiate(client, authorization_header)
+    await send(client, url, authorization_header, 0, content[::-1])
+
+    response = await client.post(f"{url}/finalize", headers=authorization_header)
+    assert response.status_code == 400
+    response = await client.head(url, headers=authorization_header)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_resumable_upload_unauthorized(client: AsyncClient):
+    """
+    Trying to start a resumable upload without auth
+    """
+    response = await client.post("/api/uploads/resumable", json=declared)
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_interrupted_chunk_kept(tmp_path):
+    """
+    Trying to append chunks cut off by the client and over the size limit
+    """
+    path = str(tmp_path / "partial")
+
+    async def interrupted():
+        yield content[:10]
+        raise ClientDisconnect()
+
+    with pytest.raises(ClientDisconnect):
+        await append_stream(interrupted(), path, len(content))
+    assert os.path.getsize(path) == 10
+
+    async def oversized():
+        yield content
+
+    with pytest.raises(HTTPException):
+        await append_stream(oversized(), path, 100)
+    assert os.path.getsize(path) == 10
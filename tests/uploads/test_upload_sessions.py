@@ -0,0 +1,150 @@
+import os
+import pytest
+from hashlib import sha256
+from httpx import AsyncClient
+from pytest_schema import exact_schema
+from src.config import settings
+from src.db import session_manager
+from src.services.job import get_by_id
+from ..jobs.schemas import job_created
+from .schemas import upload_session
+
+
+content = b"\x89PNG fake image content"
+declared = {
+    "filename": "photo.png",
+    "size": len(content),
+    "content_hash": sha256(content).hexdigest(),
+}
+
+
+@pytest.mark.asyncio
+async def test_upload_session(client: AsyncClient, create_user, authorization_header):
+    """
+    Trying to upload an image through an upload session
+    """
+    response = await client.post(
+        "/api/uploads", json={"files": [declared]}, headers=authorization_header
+    )
+    assert response.status_code == 201
+    assert exact_schema(upload_session) == response.json()
+    session_id = response.json()["id"]
+    slot = response.json()["slots"][0]
+
+    response = await client.put(
+        slot["url"], content=content, headers=authorization_header
+    )
+    assert response.status_code == 204
+
+    response = await client.post(
+        f"/api/uploads/{session_id}/complete", headers=authorization_header
+    )
+    assert response.status_code == 202
+    assert exact_schema(job_created) == response.json()
+    assert response.json()["status"] == "pending"
+    async with session_manager.session() as db:
+        job = await get_by_id(db, response.json()["job_id"])
+        assert os.listdir(job.input_dir) == [f"{declared['content_hash']}.png"]
+
+    # Completing consumes the session
+    response = await client.post(
+        f"/api/uploads/{session_id}/complete", headers=authorization_header
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_upload_session_known_content(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to complete a session declaring content stored before without
+    uploading it
+    """
+    for uploads in (True, False):
+        response = await client.post(
+            "/api/uploads", json={"files": [declared]}, headers=authorization_header
+        )
+        session_id = response.json()["id"]
+        slot = response.json()["slots"][0]
+        if uploads:
+            await client.put(slot["url"], content=content, headers=authorization_header)
+        response = await client.post(
+            f"/api/uploads/{session_id}/complete", headers=authorization_header
+        )
+    assert response.status_code == 409
+
+    response = await client.put(
+        slot["url"], content=content, headers=authorization_header
+    )
+    assert response.status_code == 204
+    response = await client.post(
+        f"/api/uploads/{session_id}/complete", headers=authorization_header
+    )
+    assert response.status_code == 202
+    assert response.json()["files_data"][0]["file_size"] == len(content)
+    assert os.listdir(os.path.join(settings.INPUT_PATH, "uploads", session_id)) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_session_wrong_content(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to upload content other than declared and complete the session
+    """
+    response = await client.post(
+        "/api/uploads", json={"files": [declared]}, headers=authorization_header
+    )
+    session_id = response.json()["id"]
+    slot = response.json()["slots"][0]
+
+    response = await client.put(
+        slot["url"], content=content[::-1], headers=authorization_header
+    )
+    assert response.status_code == 400
+    response = await client.put(
+        slot["url"], content=content * 2, headers=authorization_header
+    )
+    assert response.status_code == 413
+
+    response = await client.post(
+        f"/api/uploads/{session_id}/complete", headers=authorization_header
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_upload_session_limits(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to declare files over the upload limits
+    """
+    too_large = {**declared, "size": 1024 * 1024 * 1024}
+    response = await client.post(
+        "/api/uploads", json={"files": [too_large]}, headers=authorization_header
+    )
+    assert response.status_code == 413
+
+    bad_hash = {**declared, "content_hash": "not a hash"}
+    response = await client.post(
+        "/api/uploads", json={"files": [bad_hash]}, headers=authorization_header
+    )
+    assert response.status_code == 422
+
+    for filename in ("photo.png/..", "photo.png/../x"):
+        bad_name = {**declared, "filename": filename}
+        response = await client.post(
+            "/api/uploads", json={"files": [bad_name]}, headers=authorization_header
+        )
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_upload_session_unauthorized(client: AsyncClient):
+    """
+    Trying to open an upload session without auth
+    """
+    response = await client.post("/api/uploads", json={"files": [declared]})
+    assert response.status_code == 401
@@ -0,0 +1,56 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from src.db import session_manager
+from src.models import Image, User
+
+
+user_data = {"username": "username", "password": "password"}
+
+
+@pytest_asyncio.fixture
+async def create_images(create_user):
+    async with session_manager.session() as session:
+        user = (
+            await session.execute(
+                User.__table__.select().where(User.username == user_data["username"])
+            )
+        ).one()
+        session.add_all(
+            [
+                Image(name=f"{i}.png", size=1, location=f"/{i}.png", user_id=user.id)
+                for i in range(20)
+            ]
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path, queries",
+    [
+        ("/api/users/me", 0),
+        ("/api/users", 1),
+        (f"/api/users/{user_data['username']}", 1),
+        ("/api/users/images/results", 1),
+        ("/api/roles", 1),
+    ],
+)
+async def test_query_count(
+    client: AsyncClient,
+    create_images,
+    authorization_header,
+    count_queries,
+    path,
+    queries,
+):
+    """
+    Trying to read users, roles and images with a fixed number of queries
+    """
+    # Loads and caches the current user
+    await client.get("/api/users/me", headers=authorization_header)
+    count_queries.clear()
+
+    response = await client.get(path, headers=authorization_header)
+    assert response.status_code == 200
+    assert len(count_queries) == queries, count_queries
@@ -0,0 +1,100 @@
+import pytest
+import pytest_asyncio
+from base64 import urlsafe_b64encode
+from datetime import datetime, timedelta, timezone
+from httpx import AsyncClient
+from sqlalchemy import select as sa_select
+from src.db import session_manager
+from src.models import Image, User
+from src.pagination import encode_cursor
+
+
+user_data = {"username": "username", "password": "password"}
+
+
+@pytest_asyncio.fixture
+async def create_images(create_user):
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    async with session_manager.session() as session:
+        user_id = (
+            await session.execute(
+                sa_select(User.id).where(User.username == user_data["username"])
+            )
+        ).scalar_one()
+        # Pairs of images share a timestamp, the id breaks ties
+        session.add_all(
+            [
+                Image(
+                    name=f"{i}.png",
+                    size=i,
+                    location=f"/{i}.png",
+                    user_id=user_id,
+                    created_at=started + timedelta(seconds=i // 2),
+                )
+                for i in range(7)
+            ]
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_read_images_pages(
+    client: AsyncClient, create_images, authorization_header
+):
+    """
+    Trying to read all images page by page
+    """
+    names, after, pages = [], None, 0
+    while True:
+        params = {"limit": 3} | ({"after": after} if after else {})
+        response = await client.get(
+            "/api/users/images/results", params=params, headers=authorization_header
+        )
+        assert response.status_code == 200
+        assert len(response.json()) <= 3
+        names += [image["name"] for image in response.json()]
+        pages += 1
+        after = response.headers.get("x-next-cursor")
+        if not after:
+            break
+
+    assert pages == 3
+    assert sorted(names) == [f"{i}.png" for i in range(7)]
+    created = [int(name.split(".")[0]) // 2 for name in names]
+    assert created == sorted(created)
+
+
+@pytest.mark.asyncio
+async def test_read_images_last_page(
+    client: AsyncClient, create_images, authorization_header
+):
+    """
+    Trying to read images when everything fits one page
+    """
+    response = await client.get(
+        "/api/users/images/results", params={"limit": 7}, headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 7
+    assert "x-next-cursor" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_read_images_invalid_cursor(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to read images after a malformed cursor
+    """
+    crafted = [
+        urlsafe_b64encode(raw).decode()
+        for raw in (b"5", b"[1, 2]", b'{"a": 1}', b'[["x"], {"y": 1}]')
+    ]
+    for cursor in ["not-a-cursor", encode_cursor(["x"]), *crafted]:
+        response = await client.get(
+            "/api/users/images/results",
+            params={"after": cursor},
+            headers=authorization_header,
+        )
+        assert response.status_code == 400
+        assert response.json().get("detail") == "Invalid cursor"
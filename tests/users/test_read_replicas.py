@@ -0,0 +1,95 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from src.db import RECENT_WRITE_KEY_PREFIX, DatabaseSessionManager, session_manager
+from src.redis import RedisClient
+
+
+user_data = {"username": "username", "password": "password"}
+
+
+async def use_replica(url: str) -> list[str]:
+    """
+    Points the session manager at one replica and returns the statements
+    sent to it.
+    """
+    replica = DatabaseSessionManager._create_engine(url)
+    statements = []
+    event.listen(
+        replica.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    session_manager._replicas = [replica]
+    session_manager._replica_session_makers = [async_sessionmaker(bind=replica)]
+    await session_manager.check_replicas()
+    return statements
+
+
+@pytest_asyncio.fixture
+async def replica_url(connection_test):
+    # The test database stands in for a replica of itself
+    url = session_manager._engine.url
+    yield url.render_as_string(hide_password=False)
+    for replica in session_manager._replicas:
+        await replica.dispose()
+    session_manager._replicas = []
+    session_manager._replica_session_makers = []
+    session_manager._healthy_replicas = []
+
+
+@pytest.mark.asyncio
+async def test_reads_use_replica(client: AsyncClient, create_user, replica_url):
+    """
+    Trying to read users from a replica
+    """
+    statements = await use_replica(replica_url)
+    statements.clear()
+    response = await client.get("/api/users")
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_reads_after_own_write(
+    client: AsyncClient, create_user, authorization_header, replica_url
+):
+    """
+    Trying to read own user from the primary right after updating it
+    """
+    statements = await use_replica(replica_url)
+    response = await client.patch(
+        "/api/users/username",
+        json={"username": "not_User"},
+        headers=authorization_header,
+    )
+    assert response.status_code == 200
+
+    statements.clear()
+    response = await client.get("/api/users/not_User", headers=authorization_header)
+    assert response.status_code == 200
+    assert statements == []
+
+    user_id = response.json()["id"]
+    await RedisClient().async_conn.delete(f"{RECENT_WRITE_KEY_PREFIX}{user_id}")
+    response = await client.get("/api/users/not_User", headers=authorization_header)
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_reads_fall_back_to_primary(
+    client: AsyncClient, create_user, replica_url, monkeypatch
+):
+    """
+    Trying to read users while the only replica is down
+    """
+    monkeypatch.setattr("src.db.settings.DB_REPLICA_HEALTH_TIMEOUT", 1)
+    await use_replica("postgresql+asyncpg://nobody@127.0.0.1:1/missing")
+    assert session_manager._healthy_replicas == []
+
+    response = await client.get("/api/users")
+    assert response.status_code == 200
+    assert response.json() != []
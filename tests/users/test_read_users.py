@@ -23,3 +23,59 @@ async def test_read_users(client: AsyncClient, create_user, authorization_header
     assert response.status_code == 200
     assert response.json() != []
     assert exact_schema(users) == response.json()
+
+
+@pytest.mark.asyncio
+async def test_read_users_pages(client: AsyncClient):
+    """
+    Trying to read all users page by page
+    """
+    for i in range(5):
+        await client.post(
+            "/api/users", json={"username": f"user_{i}", "password": "password"}
+        )
+
+    usernames, after = [], None
+    while True:
+        params = {"limit": 2} | ({"after": after} if after else {})
+        response = await client.get("/api/users", params=params)
+        assert response.status_code == 200
+        assert exact_schema(users) == response.json()
+        usernames += [user["username"] for user in response.json()]
+        after = response.headers.get("x-next-cursor")
+        if not after:
+            break
+
+    assert usernames == [f"user_{i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_next_cursor_exposed_to_frontend(client: AsyncClient, create_user):
+    """
+    Trying to read the next page cursor from the browser frontend
+    """
+    response = await client.get(
+        "/api/users", params={"limit": 1}, headers={"Origin": "http://localhost:3000"}
+    )
+    exposed = response.headers["access-control-expose-headers"].lower()
+    assert "x-next-cursor" in exposed
+
+
+@pytest.mark.asyncio
+async def test_read_users_fields(client: AsyncClient, create_user, count_queries):
+    """
+    Trying to read only some fields of users
+    """
+    response = await client.get("/api/users", params={"fields": "username"})
+    assert response.status_code == 200
+    assert response.json() == [{"username": "username"}]
+    assert not any("roles" in statement for statement in count_queries)
+
+    response = await client.get("/api/users", params={"fields": "id,role"})
+    assert response.status_code == 200
+    assert exact_schema([{"id": str, "role": {"name": str, "description": str}}]) == (
+        response.json()
+    )
+
+    response = await client.get("/api/users", params={"fields": "hashed_password"})
+    assert response.status_code == 400
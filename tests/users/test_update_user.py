@@ -1,6 +1,9 @@
 import pytest
 from httpx import AsyncClient
 from pytest_schema import exact_schema
+from sqlalchemy import update as sa_update
+from src.db import session_manager
+from src.models import User
 from .schemas import user
 
 
@@ -186,3 +189,36 @@ async def test_update_user_username_blank_password(
         headers=authorization_header,
     )
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_update_user_refreshes_cached_user(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to get current user from cache before and after update
+    """
+    response = await client.get("/api/users/me", headers=authorization_header)
+    assert response.json().get("username") == user_data["username"]
+
+    async with session_manager.session() as session:
+        await session.execute(
+            sa_update(User)
+            .where(User.username == user_data["username"])
+            .values(username="renamed")
+        )
+        await session.commit()
+
+    # Changed behind the service layer, cached user is still served
+    response = await client.get("/api/users/me", headers=authorization_header)
+    assert response.json().get("username") == user_data["username"]
+
+    response = await client.patch(
+        "/api/users/renamed",
+        json={"username": "not_User"},
+        headers=authorization_header,
+    )
+    assert response.status_code == 200
+
+    response = await client.get("/api/users/me", headers=authorization_header)
+    assert response.json().get("username") == "not_User"
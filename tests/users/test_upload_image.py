@@ -0,0 +1,235 @@
+import asyncio
+import os
+import pytest
+from hashlib import sha256
+from httpx import AsyncClient
+from src.config import settings
+
+
+image_content = b"\x89PNG fake image content"
+
+
+def stored_originals() -> list[str]:
+    originals = os.path.join(settings.INPUT_PATH, "originals")
+    return [name for _, _, names in os.walk(originals) for name in names]
+
+
+@pytest.fixture
+def small_limits(monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 4)
+    monkeypatch.setattr(settings, "UPLOAD_MAX_FILE_SIZE", len(image_content))
+    monkeypatch.setattr(settings, "UPLOAD_MAX_REQUEST_SIZE", len(image_content) * 2)
+
+
+@pytest.mark.asyncio
+async def test_upload_image_unauthorized(client: AsyncClient):
+    """
+    Trying to upload image without auth
+    """
+    files = [("files", ("photo.png", image_content, "image/png"))]
+    response = await client.post("/api/users/upload_image", files=files)
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_upload_image_streamed(
+    client: AsyncClient, create_user, authorization_header, small_limits
+):
+    """
+    Trying to upload image in small chunks
+    """
+    files = [("files", ("photo.png", image_content, "image/png"))]
+    response = await client.post(
+        "/api/users/upload_image", files=files, headers=authorization_header
+    )
+    assert response.status_code == 202
+    file_data = response.json().get("files_data")[0]
+    assert file_data.get("file_size") == len(image_content)
+    assert file_data.get("content_hash") == sha256(image_content).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_upload_too_large_image(
+    client: AsyncClient, create_user, authorization_header, small_limits
+):
+    """
+    Trying to upload image bigger than per-file limit
+    """
+    files = [("files", ("photo.png", image_content * 2, "image/png"))]
+    response = await client.post(
+        "/api/users/upload_image", files=files, headers=authorization_header
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"] == "File is too large"
+
+
+@pytest.mark.asyncio
+async def test_upload_too_large_request(
+    client: AsyncClient, create_user, authorization_header, small_limits
+):
+    """
+    Trying to upload images bigger than per-request limit in total
+    """
+    files = [("files", (f"{i}.png", image_content, "image/png")) for i in range(3)]
+    response = await client.post(
+        "/api/users/upload_image", files=files, headers=authorization_header
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Upload is too large"
+
+
+@pytest.mark.asyncio
+async def test_upload_too_large_rejected_early(
+    client: AsyncClient, create_user, authorization_header, small_limits, monkeypatch
+):
+    """
+    Trying to send a request body over the limit, declared and streamed
+    """
+    monkeypatch.setattr(settings, "UPLOAD_MULTIPART_OVERHEAD", 0)
+    files = [("files", ("photo.png", image_content * 4, "image/png"))]
+    response = await client.post(
+        "/api/users/upload_image", files=files, headers=authorization_header
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Upload is too large"
+
+    async def body():
+        yield (
+            b"--x\r\nContent-Disposition: form-data; "
+            b'name="files"; filename="photo.png"\r\n\r\n'
+        )
+        for _ in range(4):
+            yield image_content
+        yield b"\r\n--x--\r\n"
+
+    response = await client.post(
+        "/api/users/upload_image",
+        content=body(),
+        headers={
+            **authorization_header,
+            "content-type": "multipart/form-data; boundary=x",
+        },
+    )
+    assert response.status_code == 413
+    # Rejected before the endpoint started spooling files
+    assert not os.path.exists(os.path.join(settings.INPUT_PATH, "incoming"))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_uploads_isolated(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to upload two batches of the same user at the same time
+    """
+    uploads = [
+        [("files", (f"{name}.png", name.encode(), "image/png"))]
+        for name in ("first", "second")
+    ]
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/api/users/upload_image", files=files, headers=authorization_header
+            )
+            for files in uploads
+        )
+    )
+    assert [response.status_code for response in responses] == [202, 202]
+
+    for response in responses:
+        job_id = response.json().get("job_id")
+        content_hash = response.json().get("files_data")[0]["content_hash"]
+        job_dir = os.path.join(settings.INPUT_PATH, job_id)
+        assert os.listdir(job_dir) == [f"{content_hash}.png"]
+    assert os.listdir(os.path.join(settings.INPUT_PATH, "incoming")) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_upload_cleaned_up(
+    client: AsyncClient, create_user, authorization_header, small_limits
+):
+    """
+    Trying to upload images where the last one is too large
+    """
+    files = [
+        ("files", ("small.png", image_content, "image/png")),
+        ("files", ("large.png", image_content * 2, "image/png")),
+    ]
+    response = await client.post(
+        "/api/users/upload_image", files=files, headers=authorization_header
+    )
+    assert response.status_code == 413
+    assert os.listdir(os.path.join(settings.INPUT_PATH, "incoming")) == []
+    assert sorted(os.listdir(settings.INPUT_PATH)) == ["incoming", "originals"]
+    assert stored_originals() == []
+
+    response = await client.get(
+        "/api/users/images/results", headers=authorization_header
+    )
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_upload_filenames_checked(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to upload images with names that are not plain image filenames
+    """
+    for name in ("photo.jpg/evil", "photo.jpg/../../x", "photo", "photo.exe"):
+        files = [("files", (name, image_content, "image/png"))]
+        response = await client.post(
+            "/api/users/upload_image", files=files, headers=authorization_header
+        )
+        assert response.status_code == 400
+    assert stored_originals() == []
+
+    # Only the extension of a name ends up in paths
+    files = [("files", ("../photo.PNG", image_content, "image/png"))]
+    response = await client.post(
+        "/api/users/upload_image", files=files, headers=authorization_header
+    )
+    assert response.status_code == 202
+    assert stored_originals() == [f"{sha256(image_content).hexdigest()}.png"]
+
+
+@pytest.mark.asyncio
+async def test_failed_insert_cleaned_up(
+    client: AsyncClient, create_user, authorization_header, monkeypatch
+):
+    """
+    Trying to upload images when storing their rows fails
+    """
+
+    async def failing_create(db, images):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr("src.uploads.create_images", failing_create)
+    files = [
+        ("files", ("first.png", image_content, "image/png")),
+        ("files", ("second.png", image_content + b"!", "image/png")),
+    ]
+    response = await client.post(
+        "/api/users/upload_image", files=files, headers=authorization_header
+    )
+    assert response.status_code == 500
+    assert stored_originals() == []
+
+
+@pytest.mark.asyncio
+async def test_upload_images_single_insert(
+    client: AsyncClient, create_user, authorization_header, count_queries
+):
+    """
+    Trying to upload several images with one insert of their rows
+    """
+    files = [
+        ("files", (f"{i}.png", image_content + bytes([i]), "image/png"))
+        for i in range(5)
+    ]
+    response = await client.post(
+        "/api/users/upload_image", files=files, headers=authorization_header
+    )
+    assert response.status_code == 202
+    inserts = [s for s in count_queries if s.startswith("INSERT INTO images")]
+    assert len(inserts) == 1